@@ -1,14 +1,25 @@
 # DListPerson.py
+import os
+from collections import deque
 from PySide6.QtWidgets import QApplication, QWidget
-from PySide6.QtCore import Qt, QPoint, QTimer
+from PySide6.QtCore import Qt, QPoint, QTimer, QElapsedTimer, QFileSystemWatcher, Signal
 from PySide6.QtGui import QPainter, QMouseEvent, QWheelEvent, QResizeEvent
 from background_renderer import BackgroundRenderer
 from scrollbar_renderer import ScrollBarRenderer
 from fields_renderer import FieldsRenderer
 from debug_renderer import DebugRenderer
+from field_accessors import register_value_accessor
+from perf_counters import PerfCounters
+from profiler import profiler
 
 
 class DListPerson(QWidget):
+    # Прогресс и завершение пошаговой загрузки полей (количество созданных полей)
+    fields_load_progress = Signal(int)
+    fields_loaded = Signal(int)
+    # Шаблон перечитан после изменения файла: (добавлено, удалено, изменено)
+    fields_reloaded = Signal(int, int, int)
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -18,6 +29,35 @@ class DListPerson(QWidget):
         self.fields_renderer = FieldsRenderer(self)
         self.debug_renderer = DebugRenderer(self)
 
+        # Модель значений полей: версии, измененные поля, сигнал value_changed
+        self.value_model = self.fields_renderer.field_manager.model
+
+        # Счетчики производительности для оверлея, собираются только пока он включен
+        self.perf_counters = PerfCounters()
+        self.fields_renderer.set_perf_counters(self.perf_counters)
+
+        # Последние смещения тачпада для оценки скорости кинетической прокрутки
+        self._wheel_samples: deque = deque()
+        self._wheel_clock = QElapsedTimer()
+        self._wheel_clock.start()
+        # Система сама продолжает прокрутку по инерции (macOS) - своя инерция не нужна
+        self._wheel_momentum_seen: bool = False
+
+        # Слежение за файлом шаблона; сохранение в редакторе дает несколько событий подряд
+        self._fields_watcher: QFileSystemWatcher = None
+        self._watched_fields_path: str = ""
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(150)
+        self._reload_timer.timeout.connect(self._reload_watched_fields)
+        # Сколько ждать появления удаленного файла шаблона, мс
+        self.reload_missing_timeout_ms: int = 2000
+        self._reload_missing_ms: int = 0
+
+        # Экран и окно, изменения которых меняют ширину фона и частоту кадров
+        self._screen = None
+        self._screen_window = None
+
         self.setMouseTracking(True)
         self._initialize()
 
@@ -38,28 +78,138 @@ class DListPerson(QWidget):
         self._setup_connections()
 
     def _calculate_width(self) -> None:
-        screen = QApplication.primaryScreen()
+        # Экран, на котором находится виджет (до показа - основной)
+        screen = self.screen() or QApplication.primaryScreen()
+        if screen is not self._screen:
+            if self._screen is not None:
+                self._screen.geometryChanged.disconnect(self._on_screen_geometry_changed)
+            self._screen = screen
+            screen.geometryChanged.connect(self._on_screen_geometry_changed)
+
         screen_width = screen.geometry().width()
         fixed_width = int(screen_width * 3 / 5)
+        self.background_renderer.set_device_pixel_ratio(screen.devicePixelRatio())
         self.background_renderer.set_fixed_width(fixed_width)
+        self.scrollbar_renderer.scheduler.set_frame_rate(screen.refreshRate())
+
+    def _on_screen_geometry_changed(self, geometry) -> None:
+        self._calculate_width()
+
+    def _on_screen_changed(self, screen) -> None:
+        self._calculate_width()
+
+    def showEvent(self, event) -> None:
+        # Окно верхнего уровня существует только после показа; его перенос на другой экран
+        # меняет ширину фона, плотность пикселей и частоту кадров
+        window = self.window().windowHandle()
+        if window is not None and window is not self._screen_window:
+            if self._screen_window is not None:
+                self._screen_window.screenChanged.disconnect(self._on_screen_changed)
+            self._screen_window = window
+            window.screenChanged.connect(self._on_screen_changed)
+        self._calculate_width()
+        super().showEvent(event)
 
     def _setup_connections(self) -> None:
         # Связываем скроллбар с обновлением позиций
         self.scrollbar_renderer.offset_changed.connect(self._on_offset_changed)
+        self.fields_renderer.fields_load_progress.connect(self.fields_load_progress)
+        self.fields_renderer.fields_loaded.connect(self.fields_loaded)
+
+        # Фон загружается асинхронно - пересчитываем прокрутку, когда он готов
+        self.background_renderer.preview_ready.connect(self._on_background_changed)
+        self.background_renderer.background_ready.connect(self._on_background_changed)
+        # Полосы огромного фона декодируются в фоне и дорисовываются по готовности
+        self.background_renderer.tile_ready.connect(self.update)
 
     def _on_offset_changed(self, offset_y: int) -> None:
         self.background_renderer.set_offset_y(offset_y)
         self._update_fields_position()
         self.update()
 
+    def _on_background_changed(self) -> None:
+        self._update_scroll_limits()
+        self._update_fields_position()
+        self.update()
+
     def set_background_image(self, path_to_image: str) -> None:
         self.background_renderer.set_background_image(path_to_image)
         self._update_scroll_limits()
 
-    def set_fields(self, field_xml_path: str) -> None:
+    def set_resize_settle_ms(self, settle_ms: int) -> None:
+        """Пауза в изменении ширины, после которой фон масштабируется качественно (0 - сразу)"""
+        self.background_renderer.set_resize_settle_ms(settle_ms)
+
+    def set_template_cache(self, enabled: bool, cache_dir: str = None) -> None:
+        """Включает кэш скомпилированных шаблонов (без cache_dir кэш хранится рядом с XML)"""
+        self.fields_renderer.set_template_cache(enabled, cache_dir)
+
+    def set_container_scrolling(self, enabled: bool) -> None:
+        """Включает прокрутку полей перемещением одного контейнера"""
+        self.fields_renderer.set_container_mode(enabled)
+
+    def set_lazy_fields(self, enabled: bool) -> None:
+        """Включает отрисовку полей без виджетов (до вызова set_fields)"""
+        self.fields_renderer.set_lazy_mode(enabled)
+
+    def set_fields(self, field_xml_path: str, incremental: bool = False, watch: bool = False) -> None:
+        """Загружает поля из XML; watch - перечитывать шаблон при изменении файла"""
+        self._watch_fields(field_xml_path if watch else "")
+
+        # Виджеты предыдущей формы возвращаются в пул и переиспользуются новой
+        self.fields_renderer.clear_fields()
+
+        if incremental:
+            # Поля создаются частями, прогресс сообщается сигналами fields_load_progress/fields_loaded
+            self.fields_renderer.load_fields_incremental(field_xml_path)
+            return
+
         self.fields_renderer.load_fields(field_xml_path)
         self._update_fields_position()
 
+    def _watch_fields(self, path: str) -> None:
+        if self._fields_watcher is not None and self._fields_watcher.files():
+            self._fields_watcher.removePaths(self._fields_watcher.files())
+        self._reload_timer.stop()
+        self._watched_fields_path = path
+        if not path:
+            return
+
+        if self._fields_watcher is None:
+            self._fields_watcher = QFileSystemWatcher(self)
+            self._fields_watcher.fileChanged.connect(self._on_fields_file_changed)
+        self._fields_watcher.addPath(path)
+
+    def _on_fields_file_changed(self, path: str) -> None:
+        if path == self._watched_fields_path:
+            self._reload_missing_ms = 0
+            self._reload_timer.start()
+
+    def _reload_watched_fields(self) -> None:
+        path = self._watched_fields_path
+        if not path:
+            return
+        if not os.path.exists(path):
+            # Редактор заменяет файл новым - ждем, пока он появится, но не бесконечно
+            self._reload_missing_ms += self._reload_timer.interval()
+            if self._reload_missing_ms < self.reload_missing_timeout_ms:
+                self._reload_timer.start()
+            else:
+                print(f"Ошибка: файл шаблона {path} удален, слежение за ним прекращено")
+                self._watched_fields_path = ""
+            return
+        self._reload_missing_ms = 0
+
+        # После замены файла наблюдение за старым файлом прекращается
+        if path not in self._fields_watcher.files():
+            self._fields_watcher.addPath(path)
+
+        result = self.fields_renderer.reload_fields(path)
+        if result is not None:
+            self._update_fields_position()
+            self.fields_reloaded.emit(*result)
+
+    @profiler.profiled("layout.scroll_limits")
     def _update_scroll_limits(self) -> None:
         bg_width, bg_height = self.background_renderer.get_scaled_size()
         widget_height = self.height()
@@ -79,10 +229,61 @@ class DListPerson(QWidget):
     def set_field_value(self, field_id: str, value: str) -> None:
         self.fields_renderer.set_field_value(field_id, value)
 
+    def get_all_values(self) -> dict:
+        """Возвращает словарь field_id -> значение для всех полей"""
+        return self.fields_renderer.get_all_values()
+
+    def set_values(self, mapping: dict) -> None:
+        """Заполняет поля из словаря field_id -> значение с одной перерисовкой"""
+        self.fields_renderer.set_values(mapping)
+
+    def set_widget_pool_size(self, max_per_class: int) -> None:
+        """Задает наибольшее количество хранимых в пуле виджетов одного класса"""
+        self.fields_renderer.field_manager.widget_pool.set_max_per_class(max_per_class)
+
+    def register_widget_reset_hook(self, widget_class: type, reset_hook) -> None:
+        """Разрешает переиспользовать кастомные виджеты; reset_hook(widget) сбрасывает их состояние"""
+        self.fields_renderer.field_manager.widget_pool.register_reset_hook(widget_class, reset_hook)
+
+    def get_widget_pool_stats(self) -> dict:
+        """Статистика пула виджетов: переиспользованные, созданные, доля переиспользования"""
+        return self.fields_renderer.field_manager.widget_pool.statistics()
+
+    def get_changed_values(self, since_version: int = 0) -> dict:
+        """Возвращает значения полей, измененных после версии since_version модели"""
+        return self.value_model.changed_since(since_version)
+
+    def register_value_accessor(self, widget_class: type, getter, setter, signal: str = None) -> None:
+        """Регистрирует чтение и запись значения для класса кастомного виджета
+
+        signal - имя сигнала изменения значения, через который правки попадают в модель.
+        """
+        register_value_accessor(widget_class, getter, setter, signal)
+
     def set_debug_mode(self, enabled: bool) -> None:
         self.debug_renderer.set_debug_mode(enabled)
         self.update()
 
+    def set_perf_hud(self, enabled: bool) -> None:
+        """Показывает оверлей с временем кадра, отрисовки и статистикой полей"""
+        self.perf_counters.set_enabled(enabled)
+        self.debug_renderer.set_perf_hud(enabled, self.perf_counters)
+        self.update()
+
+    def start_profiling(self) -> None:
+        """Начинает новую сессию профилирования отрисовки, загрузки и компоновки"""
+        profiler.start_session()
+
+    def stop_profiling(self) -> None:
+        profiler.stop_session()
+
+    def export_profile(self, path: str, chrome_trace: bool = False) -> None:
+        """Сохраняет профиль сессии: гистограммы фаз в JSON или замеры в формате Chrome trace"""
+        if chrome_trace:
+            profiler.export_chrome_trace(path)
+        else:
+            profiler.export_json(path)
+
     def get_absolute_coordinates(self, widget_x: int, widget_y: int) -> QPoint:
         bg_offset = self.background_renderer.get_background_offset()
         absolute_x = widget_x - bg_offset.x()
@@ -92,12 +293,34 @@ class DListPerson(QWidget):
     # Обработчики событий Qt
     def paintEvent(self, event):
         painter = QPainter(self)
+        exposed_rect = event.rect()
+
+        if self.perf_counters.enabled:
+            self._paint_measured(painter, exposed_rect)
+            return
 
         # Рендерим фон
-        self.background_renderer.render(painter)
+        self.background_renderer.render(painter, exposed_rect)
+
+        # Рендерим поля, для которых не созданы виджеты
+        self.fields_renderer.render(painter, exposed_rect)
 
         # Рендерим отладочную информацию через DebugRenderer
-        self.debug_renderer.render(painter)
+        self.debug_renderer.render(painter, exposed_rect)
+
+    def _paint_measured(self, painter: QPainter, exposed_rect) -> None:
+        """Отрисовка с замером времени каждого рендерера для оверлея производительности"""
+        perf = self.perf_counters
+        frame_started = perf.now()
+
+        for name, renderer in (("paint.background", self.background_renderer),
+                               ("paint.fields", self.fields_renderer),
+                               ("paint.debug", self.debug_renderer)):
+            started = perf.now()
+            renderer.render(painter, exposed_rect)
+            perf.add_time(name, started)
+
+        perf.end_frame(frame_started)
 
     def resizeEvent(self, event: QResizeEvent) -> None:
         width, height = event.size().width(), event.size().height()
@@ -113,30 +336,86 @@ class DListPerson(QWidget):
         super().resizeEvent(event)
 
     def wheelEvent(self, event: QWheelEvent) -> None:
-        delta = event.angleDelta().y()
-        scroll_amount = -delta // 3
-        current_offset = self.scrollbar_renderer.get_offset()
-        new_offset = max(0, min(current_offset + scroll_amount, self.scrollbar_renderer.max_offset_y))
-        self.scrollbar_renderer.set_offset(new_offset)
+        pixel_delta = event.pixelDelta().y()
+
+        phase = event.phase()
+        if phase == Qt.ScrollBegin:
+            self._wheel_momentum_seen = False
+        elif phase == Qt.ScrollMomentum:
+            self._wheel_momentum_seen = True
+
+        if phase == Qt.ScrollEnd:
+            # Палец снят с тачпада - продолжаем прокрутку по инерции, если ее не сделала система
+            if not self._wheel_momentum_seen:
+                self.scrollbar_renderer.fling(self._wheel_velocity())
+            self._wheel_samples.clear()
+            self._wheel_momentum_seen = False
+        elif pixel_delta:
+            # Тачпад с высоким разрешением присылает уже плавные смещения
+            self.scrollbar_renderer.scroll_by(-pixel_delta, animated=False)
+            if phase != Qt.ScrollMomentum:
+                self._record_wheel_sample(-pixel_delta)
+        else:
+            delta = event.angleDelta().y()
+            self.scrollbar_renderer.scroll_by(-delta // 3, animated=True)
+
         event.accept()
 
+    def _record_wheel_sample(self, delta: int) -> None:
+        self._wheel_samples.append((self._wheel_clock.elapsed(), delta))
+        self._prune_wheel_samples()
+
+    def _prune_wheel_samples(self) -> None:
+        # Для оценки скорости достаточно событий за последние 100 мс
+        now = self._wheel_clock.elapsed()
+        while self._wheel_samples and now - self._wheel_samples[0][0] > 100:
+            self._wheel_samples.popleft()
+
+    def _wheel_velocity(self) -> float:
+        """Скорость прокрутки тачпадом по последним событиям, пикс/с"""
+        # Палец мог остановиться задолго до отрыва - старые события скорость не дают
+        self._prune_wheel_samples()
+        if len(self._wheel_samples) < 2:
+            return 0.0
+        duration_ms = self._wheel_samples[-1][0] - self._wheel_samples[0][0]
+        if duration_ms <= 0:
+            return 0.0
+        return sum(delta for _, delta in self._wheel_samples) * 1000 / duration_ms
+
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
         self.debug_renderer.set_mouse_position(event.position().toPoint())
         if self.debug_renderer.debug_mode:
-            self.update()
+            # Перерисовываем только старое и новое положение перекрестия и подписи
+            self.update(self.debug_renderer.take_dirty_region())
         super().mouseMoveEvent(event)
 
     def mousePressEvent(self, event: QMouseEvent) -> None:
         if event.button() == Qt.LeftButton:
-            clicked_widget = self.childAt(event.position().toPoint())
+            pos = event.position().toPoint()
 
-            from PySide6.QtWidgets import (QLineEdit, QTextEdit, QComboBox,
-                                           QCheckBox, QSpinBox, QDoubleSpinBox)
+            # Поле под курсором находится по сетке полей без перебора виджетов
+            if not self.fields_renderer.has_editor(self.fields_renderer.field_at(pos)):
+                self.fields_renderer.clear_focus_from_fields()
+                if self.fields_renderer.activate_field_at(pos):
+                    event.accept()
+                    return
 
-            focusable_widgets = (QLineEdit, QTextEdit, QComboBox,
-                                 QCheckBox, QSpinBox, QDoubleSpinBox)
+        super().mousePressEvent(event)
 
-            if not isinstance(clicked_widget, focusable_widgets):
-                self.fields_renderer.clear_focus_from_fields()
+    def focusNextPrevChild(self, next: bool) -> bool:
+        field_data = self.fields_renderer.focus_next_field(next)
+        if field_data is None:
+            return super().focusNextPrevChild(next)
+
+        self._ensure_field_visible(field_data)
+        return True
 
-        super().mousePressEvent(event)
\ No newline at end of file
+    def _ensure_field_visible(self, field_data) -> None:
+        """Прокручивает форму так, чтобы поле оказалось в видимой области"""
+        current_offset = self.scrollbar_renderer.get_offset()
+        if current_offset <= field_data.y and field_data.y + field_data.height <= current_offset + self.height():
+            return
+
+        new_offset = field_data.y - self.height() // 3
+        new_offset = max(0, min(new_offset, self.scrollbar_renderer.max_offset_y))
+        self.scrollbar_renderer.set_offset(new_offset)
@@ -0,0 +1,186 @@
+# background_cache.py
+import threading
+from collections import OrderedDict
+from PySide6.QtCore import Qt, QSize, QRect
+from PySide6.QtGui import QImage, QImageReader
+from profiler import profiler
+
+
+class BackgroundImageCache:
+    """Уровни фона, декодируемые из файла в нужном разрешении, и LRU изображений по ширине
+
+    Уровень k - это исходное изображение, уменьшенное в 2^k раз. Уровни декодируются
+    через QImageReader.setScaledSize, поэтому полноразмерное изображение в памяти не
+    создается, если текущей ширине достаточно уменьшенного уровня.
+    """
+
+    DEFAULT_BYTE_BUDGET = 256 * 1024 * 1024
+    # Масштабированный фон больше этого объема не хранится целиком, а декодируется по областям
+    DEFAULT_MAX_RESIDENT_BYTES = 128 * 1024 * 1024
+
+    def __init__(self, path: str = "", byte_budget: int = DEFAULT_BYTE_BUDGET) -> None:
+        self.path: str = path
+        self.byte_budget: int = byte_budget
+        self.max_resident_bytes: int = self.DEFAULT_MAX_RESIDENT_BYTES
+        self._lock = threading.Lock()
+        self._source_size = None
+        self.error_string: str = ""
+        # Степень уменьшения -> декодированный уровень
+        self._levels: dict = {}
+        # Ширина -> масштабированное изображение, в порядке последнего использования
+        self._scaled: OrderedDict = OrderedDict()
+
+    def open(self) -> bool:
+        """Читает размер изображения из заголовка файла, не декодируя его"""
+        reader = QImageReader(self.path)
+        size = reader.size()
+        if not size.isValid():
+            # Формат не сообщает размер без декодирования
+            image = reader.read()
+            if image.isNull():
+                self.error_string = reader.errorString()
+                return False
+            self.set_source(image)
+            return True
+
+        with self._lock:
+            self._source_size = size
+            self._levels.clear()
+            self._scaled.clear()
+        return True
+
+    def set_source(self, image: QImage) -> None:
+        """Устанавливает уже декодированное изображение в качестве исходного"""
+        with self._lock:
+            self._source_size = image.size()
+            self._levels = {0: image}
+            self._scaled.clear()
+
+    def has_image(self) -> bool:
+        return self._source_size is not None
+
+    def source_size(self):
+        return self._source_size
+
+    def scaled_size(self, width: int) -> QSize:
+        """Размер изображения после масштабирования до ширины width"""
+        source = self._source_size
+        if source is None or source.width() <= 0:
+            return QSize()
+        return QSize(width, max(1, round(source.height() * width / source.width())))
+
+    def is_resident(self, width: int) -> bool:
+        """Помещается ли изображение ширины width в память целиком"""
+        size = self.scaled_size(width)
+        return size.width() * size.height() * 4 <= self.max_resident_bytes
+
+    def get_cached(self, width: int):
+        """Возвращает изображение нужной ширины из LRU или None"""
+        with self._lock:
+            image = self._scaled.get(width)
+            if image is not None:
+                self._scaled.move_to_end(width)
+            return image
+
+    @profiler.profiled("background.scale")
+    def scaled(self, width: int) -> QImage:
+        """Возвращает изображение ширины width, масштабируя от ближайшего большего уровня"""
+        cached = self.get_cached(width)
+        if cached is not None:
+            return cached
+
+        source = self._source_for(width)
+        if source.isNull():
+            # Ошибка декодирования не кэшируется; причина - в error_string
+            return source
+        # Масштабирование выполняется без блокировки - оно самое дорогое
+        image = source.scaledToWidth(width, Qt.SmoothTransformation) if source.width() != width else source
+
+        with self._lock:
+            self._scaled[width] = image
+            self._scaled.move_to_end(width)
+            self._enforce_budget(self._level_index(width))
+        return image
+
+    @profiler.profiled("background.decode_region")
+    def decode_region(self, width: int, rect: QRect) -> QImage:
+        """Декодирует только область rect изображения, масштабированного до ширины width
+
+        Форматы без поддержки setScaledClipRect (например, PNG) декодируют для
+        каждой области весь файл, поэтому вызывать метод следует вне GUI потока.
+        """
+        if not self.path:
+            # Изображение без файла - вырезаем область из исходного
+            source = self._levels.get(0, QImage())
+            factor = source.width() / width
+            source_rect = QRect(int(rect.x() * factor), int(rect.y() * factor),
+                                max(1, int(rect.width() * factor)), max(1, int(rect.height() * factor)))
+            return source.copy(source_rect).scaled(rect.size(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+        reader = QImageReader(self.path)
+        reader.setScaledSize(self.scaled_size(width))
+        reader.setScaledClipRect(rect)
+        return reader.read()
+
+    def _level_index(self, width: int) -> int:
+        """Наибольшая степень уменьшения, при которой уровень не уже width"""
+        source_width = self._source_size.width()
+        level = 0
+        while (source_width >> (level + 1)) >= width:
+            level += 1
+        return level
+
+    def _source_for(self, width: int) -> QImage:
+        target = self._level_index(width)
+
+        with self._lock:
+            # Уже декодированный уровень с наименьшей шириной, но не уже требуемой
+            candidates = [level for level in self._levels if level <= target]
+            if candidates:
+                return self._levels[max(candidates)]
+
+        # Декодирование выполняется без блокировки
+        image = self._decode_level(target)
+        if not image.isNull():
+            with self._lock:
+                self._levels[target] = image
+        return image
+
+    @profiler.profiled("background.decode")
+    def _decode_level(self, level: int) -> QImage:
+        reader = QImageReader(self.path)
+        if level > 0:
+            source = self._source_size
+            reader.setScaledSize(QSize(max(1, source.width() >> level), max(1, source.height() >> level)))
+        image = reader.read()
+        if image.isNull():
+            self.error_string = reader.errorString()
+        return image
+
+    def _enforce_budget(self, current_level: int) -> None:
+        # Самое свежее изображение не вытесняется, даже если бюджет превышен
+        while len(self._scaled) > 1 and self._memory_usage() > self.byte_budget:
+            self._scaled.popitem(last=False)
+
+        # Уровни крупнее нужного для текущей ширины можно декодировать повторно
+        if self._memory_usage() > self.byte_budget and self.path:
+            for level in sorted(self._levels):
+                if level >= current_level or self._memory_usage() <= self.byte_budget:
+                    break
+                del self._levels[level]
+
+    def _memory_usage(self) -> int:
+        total = sum(level.sizeInBytes() for level in self._levels.values())
+        total += sum(image.sizeInBytes() for image in self._scaled.values())
+        return total
+
+    def memory_usage(self) -> int:
+        """Возвращает объем памяти, занятый изображениями кэша, в байтах"""
+        with self._lock:
+            return self._memory_usage()
+
+    def set_byte_budget(self, byte_budget: int) -> None:
+        with self._lock:
+            self.byte_budget = byte_budget
+            if self._scaled:
+                self._enforce_budget(self._level_index(next(reversed(self._scaled))))
@@ -0,0 +1,185 @@
+# background_loader.py
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, Signal
+from PySide6.QtGui import QImage, QImageReader
+from background_cache import BackgroundImageCache
+
+
+class _LoaderSignals(QObject):
+    """Сигналы фоновых задач (испускаются из рабочих потоков)"""
+    preview_ready = Signal(int, QImage)
+    image_ready = Signal(int, object, QImage)
+    streamed_ready = Signal(int, object)
+    failed = Signal(int, str)
+    region_ready = Signal(object, QImage)
+
+
+class _LoadTask(QRunnable):
+    """Декодирует и масштабирует изображение фона в рабочем потоке"""
+
+    def __init__(self, loader: 'BackgroundLoader', request_id: int, path: str,
+                 cache: BackgroundImageCache, width: int, preview_width: int) -> None:
+        super().__init__()
+        self.loader = loader
+        self.request_id = request_id
+        self.path = path
+        self.cache = cache
+        self.width = width
+        self.preview_width = preview_width
+
+    def _is_cancelled(self) -> bool:
+        return self.loader.is_cancelled(self.request_id)
+
+    def run(self) -> None:
+        signals = self.loader.signals
+        if self._is_cancelled():
+            return
+
+        cache = self.cache
+        if cache is None:
+            self._emit_preview()
+            if self._is_cancelled():
+                return
+
+            # Новый кэш строится в рабочем потоке и передается в GUI поток готовым
+            cache = BackgroundImageCache(self.path, self.loader.cache_budget)
+            if not cache.open():
+                signals.failed.emit(self.request_id, cache.error_string)
+                return
+
+        if self._is_cancelled():
+            return
+
+        if not cache.is_resident(self.width):
+            # Фон слишком велик - он будет декодироваться по видимым областям
+            signals.streamed_ready.emit(self.request_id, cache)
+            return
+
+        scaled = cache.scaled(self.width)
+        if scaled.isNull():
+            # Заголовок прочитан, но само изображение декодировать не удалось
+            signals.failed.emit(self.request_id, cache.error_string or "не удалось декодировать изображение")
+            return
+        if not self._is_cancelled():
+            signals.image_ready.emit(self.request_id, cache, scaled)
+
+    def _emit_preview(self) -> None:
+        """Быстро декодирует уменьшенную копию для предварительного показа"""
+        if self.preview_width <= 0:
+            return
+
+        reader = QImageReader(self.path)
+        size = reader.size()
+        if not size.isValid() or size.width() <= self.preview_width:
+            return
+
+        # Растянутое превью огромного фона само не поместилось бы в память
+        preview_height = size.height() * self.width // size.width()
+        if self.width * preview_height * 4 > BackgroundImageCache.DEFAULT_MAX_RESIDENT_BYTES:
+            return
+
+        reader.setScaledSize(QSize(self.preview_width, max(1, size.height() * self.preview_width // size.width())))
+        preview = reader.read()
+        if preview.isNull() or self._is_cancelled():
+            return
+
+        # Превью растягивается до итоговой ширины, чтобы размеры фона сразу были верными
+        preview = preview.scaledToWidth(self.width, Qt.FastTransformation)
+        self.loader.signals.preview_ready.emit(self.request_id, preview)
+
+
+class _RegionTask(QRunnable):
+    """Декодирует область фона, который не помещается в память целиком"""
+
+    def __init__(self, signals: _LoaderSignals, cache: BackgroundImageCache, width: int, rect, tag,
+                 is_stale) -> None:
+        super().__init__()
+        self.signals = signals
+        self.cache = cache
+        self.width = width
+        self.rect = rect
+        self.tag = tag
+        self.is_stale = is_stale
+
+    def run(self) -> None:
+        # Область для прежней ширины или прокрутки уже не нужна - не декодируем ее
+        if self.is_stale is not None and self.is_stale(self.tag):
+            return
+        self.signals.region_ready.emit(self.tag, self.cache.decode_region(self.width, self.rect))
+
+
+class BackgroundLoader(QObject):
+    """Асинхронная загрузка и масштабирование фона в пуле потоков"""
+    preview_ready = Signal(QImage)
+    image_ready = Signal(object, QImage)  # BackgroundImageCache, масштабированное изображение
+    streamed_ready = Signal(object)  # BackgroundImageCache фона, декодируемого по областям
+    failed = Signal(str)
+    region_ready = Signal(object, QImage)  # метка запроса, декодированная область
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2)
+        self.preview_width: int = 256
+        self.cache_budget: int = BackgroundImageCache.DEFAULT_BYTE_BUDGET
+        self.signals = _LoaderSignals(self)
+        self._current_request: int = 0
+        # Области декодируются в отдельном пуле, cancel() их не отменяет; один поток,
+        # так как форматы без декодирования по областям читают для каждой весь файл
+        self.region_pool = QThreadPool(self)
+        self.region_pool.setMaxThreadCount(1)
+
+        self.signals.preview_ready.connect(self._on_preview_ready)
+        self.signals.image_ready.connect(self._on_image_ready)
+        self.signals.streamed_ready.connect(self._on_streamed_ready)
+        self.signals.failed.connect(self._on_failed)
+        self.signals.region_ready.connect(self.region_ready)
+
+    def load(self, path: str, width: int) -> int:
+        """Загружает изображение из файла и масштабирует его до ширины width"""
+        return self._start(path, None, width, self.preview_width)
+
+    def rescale(self, cache: BackgroundImageCache, width: int) -> int:
+        """Масштабирует уже загруженное изображение до ширины width"""
+        return self._start(cache.path, cache, width, 0)
+
+    def decode_region(self, cache: BackgroundImageCache, width: int, rect, tag, is_stale=None) -> None:
+        """Декодирует область rect фона ширины width; результат приходит в region_ready с меткой tag
+
+        is_stale(tag) проверяется в рабочем потоке перед декодированием.
+        """
+        self.region_pool.start(_RegionTask(self.signals, cache, width, rect, tag, is_stale))
+
+    def cancel_regions(self) -> None:
+        """Убирает из очереди области, декодирование которых еще не началось"""
+        self.region_pool.clear()
+
+    def cancel(self) -> None:
+        """Отменяет все незавершенные запросы"""
+        self._current_request += 1
+        self.thread_pool.clear()
+
+    def is_cancelled(self, request_id: int) -> bool:
+        return request_id != self._current_request
+
+    def _start(self, path: str, cache, width: int, preview_width: int) -> int:
+        # Новый запрос вытесняет все предыдущие
+        self.cancel()
+        request_id = self._current_request
+        self.thread_pool.start(_LoadTask(self, request_id, path, cache, width, preview_width))
+        return request_id
+
+    def _on_preview_ready(self, request_id: int, preview: QImage) -> None:
+        if not self.is_cancelled(request_id):
+            self.preview_ready.emit(preview)
+
+    def _on_image_ready(self, request_id: int, cache: BackgroundImageCache, scaled: QImage) -> None:
+        if not self.is_cancelled(request_id):
+            self.image_ready.emit(cache, scaled)
+
+    def _on_streamed_ready(self, request_id: int, cache: BackgroundImageCache) -> None:
+        if not self.is_cancelled(request_id):
+            self.streamed_ready.emit(cache)
+
+    def _on_failed(self, request_id: int, error: str) -> None:
+        if not self.is_cancelled(request_id):
+            self.failed.emit(error)
@@ -1,63 +1,399 @@
 # background_renderer.py
-from PySide6.QtGui import QPixmap, QPainter
-from PySide6.QtCore import QPoint, Qt
+from collections import OrderedDict
+from PySide6.QtGui import QPixmap, QPainter, QImage
+from PySide6.QtCore import QPoint, QRect, QRectF, QSize, Qt, QTimer, Signal
+from background_cache import BackgroundImageCache
+from background_loader import BackgroundLoader
 from renderer_interface import RendererInterface
+from shared_cache import SharedLeases, file_key, shared_background_caches, shared_background_pixmaps
 
 
 class BackgroundRenderer(RendererInterface):
+    TILE_SIZE = 512
+
+    # Фон заменен итоговым изображением / временным превью
+    background_ready = Signal()
+    preview_ready = Signal()
+    # Декодирована очередная полоса фона, который не помещается в память целиком
+    tile_ready = Signal()
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.background_image: QPixmap = QPixmap()
+        # Исходное изображение хранится в виде пирамиды уровней с LRU по ширине
+        self.image_cache: BackgroundImageCache = BackgroundImageCache()
         self.scaled_background_image: QPixmap = QPixmap()
+        # Размер масштабированного фона; при декодировании по областям scaled_background_image пуст
+        self.scaled_size: QSize = QSize()
+        self.streamed: bool = False
+        # Кэш изображения и масштабированный фон общие для всех экземпляров с тем же файлом
+        self._leases = SharedLeases()
+        self._cache_key = None
+        self._pixmap_key = None
+        # destroyed передает удаляемый объект - слот без аргументов не примет его за кэш
+        leases = self._leases
+        self.destroyed.connect(lambda: leases.release_all())
         self.fixed_width: int = 800
+        # Фон масштабируется в физических пикселях экрана и рисуется в логических координатах
+        self.device_pixel_ratio: float = 1.0
         self.offset_y: int = 0
         self.widget_width: int = 0
         self.widget_height: int = 0
 
+        # Кэш декодированных полос фона, который не помещается в память целиком: (столбец, строка) -> QPixmap
+        self.max_cached_tiles: int = 48
+        self._tiles: OrderedDict = OrderedDict()
+        # Полосы, декодируемые в пуле потоков; поколение отбрасывает результаты для прежней ширины
+        self._pending_tiles: set = set()
+        self._tile_generation: int = 0
+
+        # Декодирование и масштабирование вне GUI потока
+        self.asynchronous: bool = True
+        self.loader = BackgroundLoader(self)
+        self.loader.preview_ready.connect(self._on_preview_ready)
+        self.loader.image_ready.connect(self._on_image_ready)
+        self.loader.streamed_ready.connect(self._on_streamed_ready)
+        self.loader.failed.connect(self._on_load_failed)
+        self.loader.region_ready.connect(self._on_region_ready)
+        self._loading_path: str = ""
+
+        # Пока ширина меняется, фон растягивается быстро; качественное масштабирование -
+        # после паузы resize_settle_ms (0 - сразу при каждом изменении)
+        self.resize_settle_ms: int = 200
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(self.resize_settle_ms)
+        self._settle_timer.timeout.connect(self._apply_smooth_scale)
+        # Последний качественно масштабированный фон - источник быстрых превью
+        self._resize_source: QPixmap = QPixmap()
+
+    def set_asynchronous(self, enabled: bool) -> None:
+        self.asynchronous = enabled
+
+    def set_resize_settle_ms(self, settle_ms: int) -> None:
+        """Задает паузу в изменении ширины, после которой фон масштабируется качественно"""
+        self.resize_settle_ms = max(0, settle_ms)
+        self._settle_timer.setInterval(self.resize_settle_ms)
+
+    def set_cache_budget(self, byte_budget: int) -> None:
+        """Задает предельный объем памяти кэша масштабированных изображений"""
+        self.loader.cache_budget = byte_budget
+        self.image_cache.set_byte_budget(byte_budget)
+
     def set_background_image(self, path_to_image: str) -> None:
-        pixmap = QPixmap(path_to_image)
-        if not pixmap.isNull():
-            self.background_image = pixmap
+        key = file_key(path_to_image)
+        cache = self._leases.acquire_existing(shared_background_caches, key)
+        if cache is not None:
+            # Файл уже открыт другим экземпляром - декодировать его повторно не нужно
+            self.loader.cancel()
+            self._loading_path = ""
+            self._use_cache(key, cache)
+            if self._show_cached_width():
+                self.background_ready.emit()
+            else:
+                self.loader.rescale(cache, self._pixel_width())
+            return
+
+        if self.asynchronous:
+            self._loading_path = path_to_image
+            self.loader.load(path_to_image, self._pixel_width())
+            return
+
+        cache = BackgroundImageCache(path_to_image, self.loader.cache_budget)
+        if cache.open():
+            self.loader.cancel()
+            self._loading_path = ""
+            self._use_cache(key, self._leases.acquire(shared_background_caches, key, lambda: cache))
             self._update_scale()
+            self.background_ready.emit()
+
+    def _use_cache(self, key, cache: BackgroundImageCache) -> None:
+        """Делает cache текущим кэшем изображения, освобождая ссылку на предыдущий"""
+        if self._cache_key is not None and self._cache_key != key:
+            self._leases.release(shared_background_caches, self._cache_key)
+        self._cache_key = key
+        self.image_cache = cache
+
+    def _show_cached_width(self) -> bool:
+        """Показывает фон текущей ширины без фонового масштабирования, если это возможно"""
+        width = self._pixel_width()
+        if not self.image_cache.is_resident(width):
+            self.loader.cancel()
+            self._set_streamed(self._logical_size(self.image_cache.scaled_size(width)))
+            return True
+
+        pixmap_key = self._current_pixmap_key()
+        pixmap = self._leases.acquire_existing(shared_background_pixmaps, pixmap_key)
+        if pixmap is None and (not self.asynchronous or self.image_cache.get_cached(width) is not None):
+            # Эта ширина уже использовалась или масштабирование синхронное
+            image = self.image_cache.scaled(width)
+            if image.isNull():
+                print(f"Ошибка при загрузке фона {self.image_cache.path}: {self.image_cache.error_string}")
+                return False
+            pixmap = self._leases.acquire(shared_background_pixmaps, pixmap_key,
+                                          lambda: self._device_pixmap(image))
+        if pixmap is None:
+            return False
+
+        self.loader.cancel()
+        self._set_scaled(pixmap, pixmap_key)
+        return True
+
+    def _pixel_width(self) -> int:
+        """Ширина масштабированного фона в физических пикселях"""
+        return max(1, round(self.fixed_width * self.device_pixel_ratio))
+
+    def _logical_size(self, size: QSize) -> QSize:
+        ratio = self.device_pixel_ratio
+        return QSize(round(size.width() / ratio), round(size.height() / ratio))
+
+    def _current_pixmap_key(self):
+        return self._cache_key, self._pixel_width(), self.device_pixel_ratio
+
+    def _device_pixmap(self, image: QImage) -> QPixmap:
+        pixmap = QPixmap.fromImage(image)
+        pixmap.setDevicePixelRatio(self.device_pixel_ratio)
+        return pixmap
 
     def set_fixed_width(self, width: int) -> None:
+        if width == self.fixed_width:
+            return
         self.fixed_width = width
-        self._update_scale()
+        self._rescale()
+
+    def set_device_pixel_ratio(self, ratio: float) -> None:
+        """Задает отношение физических пикселей экрана к логическим"""
+        if ratio <= 0 or ratio == self.device_pixel_ratio:
+            return
+        self.device_pixel_ratio = ratio
+        self._rescale()
+
+    def _rescale(self) -> None:
+        if self._loading_path:
+            # Загрузка еще идет - перезапускаем ее с новой шириной
+            self.loader.load(self._loading_path, self._pixel_width())
+            return
+        if not self.image_cache.has_image():
+            return
+
+        if (self.resize_settle_ms > 0 and not self._resize_source.isNull()
+                and self._current_pixmap_key() not in shared_background_pixmaps
+                and self.image_cache.get_cached(self._pixel_width()) is None):
+            # Ширина еще меняется - растягиваем фон быстро, качественно масштабируем после паузы
+            self.loader.cancel()
+            self._show_fast_preview()
+            self._settle_timer.start()
+            return
+
+        self._apply_smooth_scale()
+
+    def _show_fast_preview(self) -> None:
+        # Превью строится от последнего качественного фона, чтобы ошибки растяжения не накапливались
+        preview = self._resize_source.scaledToWidth(self._pixel_width(), Qt.FastTransformation)
+        preview.setDevicePixelRatio(self.device_pixel_ratio)
+        self._set_scaled(preview)
+        self.preview_ready.emit()
+
+    def _apply_smooth_scale(self) -> None:
+        """Масштабирует фон до текущей ширины качественно"""
+        self._settle_timer.stop()
+        if not self.image_cache.has_image():
+            return
+
+        if self._show_cached_width():
+            self.background_ready.emit()
+            return
+        if not self.asynchronous:
+            return
+
+        # Пока идет качественное масштабирование, показываем быстро растянутый текущий фон
+        if not self._resize_source.isNull() and self.scaled_background_image.width() != self._pixel_width():
+            self._show_fast_preview()
+        self.loader.rescale(self.image_cache, self._pixel_width())
 
     def set_offset_y(self, offset_y: int) -> None:
         self.offset_y = offset_y
 
     def _update_scale(self) -> None:
-        if not self.background_image.isNull():
-            self.scaled_background_image = self.background_image.scaledToWidth(
-                self.fixed_width, Qt.SmoothTransformation
-            )
+        if self.image_cache.has_image():
+            self._show_cached_width()
+
+    def _set_pixmap_key(self, pixmap_key) -> None:
+        if self._pixmap_key is not None and self._pixmap_key != pixmap_key:
+            self._leases.release(shared_background_pixmaps, self._pixmap_key)
+        self._pixmap_key = pixmap_key
+
+    def _set_scaled(self, pixmap: QPixmap, pixmap_key=None) -> None:
+        """Задает масштабированный фон; pixmap_key - ключ общего QPixmap (None у превью)"""
+        self._set_pixmap_key(pixmap_key)
+        if pixmap_key is not None:
+            self._resize_source = pixmap
+        self.scaled_background_image = pixmap
+        self.scaled_size = pixmap.deviceIndependentSize().toSize()
+        self.streamed = False
+        self._reset_tiles()
+
+    def _set_streamed(self, size: QSize) -> None:
+        """Переключает фон в режим декодирования видимых областей по требованию"""
+        self._set_pixmap_key(None)
+        self._resize_source = QPixmap()
+        self.scaled_background_image = QPixmap()
+        self.scaled_size = size
+        self.streamed = True
+        self._reset_tiles()
+
+    def _reset_tiles(self) -> None:
+        self._tiles.clear()
+        self._pending_tiles.clear()
+        self._tile_generation += 1
+        # Запрошенные полосы прежней ширины не должны задерживать полосы на экране
+        self.loader.cancel_regions()
+
+    def _is_tile_stale(self, tag) -> bool:
+        return tag[0] != self._tile_generation
+
+    def _on_preview_ready(self, preview: QImage) -> None:
+        self._set_scaled(self._device_pixmap(preview))
+        self.preview_ready.emit()
+
+    def _adopt_loaded_cache(self, loaded: BackgroundImageCache):
+        """Делает загруженный кэш текущим; если другой экземпляр успел открыть тот же файл, берется его кэш"""
+        self._loading_path = ""
+        key = file_key(loaded.path)
+        self._use_cache(key, self._leases.acquire(shared_background_caches, key, lambda: loaded))
+        return key
+
+    def _on_image_ready(self, loaded: BackgroundImageCache, scaled: QImage) -> None:
+        key = self._adopt_loaded_cache(loaded)
+        pixmap_key = (key, scaled.width(), self.device_pixel_ratio)
+        self._set_scaled(self._leases.acquire(shared_background_pixmaps, pixmap_key,
+                                              lambda: self._device_pixmap(scaled)), pixmap_key)
+        self.background_ready.emit()
+
+    def _on_streamed_ready(self, loaded: BackgroundImageCache) -> None:
+        self._adopt_loaded_cache(loaded)
+        self._set_streamed(self._logical_size(self.image_cache.scaled_size(self._pixel_width())))
+        self.background_ready.emit()
+
+    def _on_load_failed(self, error: str) -> None:
+        print(f"Ошибка при загрузке фона {self._loading_path or self.image_cache.path}: {error}")
+        self._loading_path = ""
 
     def get_scaled_size(self) -> tuple[int, int]:
         """Возвращает размеры scaled изображения (width, height)"""
-        if self.scaled_background_image.isNull():
+        if self.scaled_size.isEmpty():
             return 0, 0
-        return self.scaled_background_image.width(), self.scaled_background_image.height()
+        return self.scaled_size.width(), self.scaled_size.height()
+
+    def memory_usage(self) -> int:
+        """Возвращает объем памяти масштабированного фона, тайлов и кэша изображений в байтах"""
+        usage = self.image_cache.memory_usage()
+        for pixmap in (self.scaled_background_image, *self._tiles.values()):
+            if not pixmap.isNull():
+                usage += pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        return usage
 
     def get_background_offset(self) -> QPoint:
         """Вычисляет смещение фона для центрирования"""
-        if self.scaled_background_image.isNull():
+        if self.scaled_size.isEmpty():
             return QPoint(0, 0)
 
-        if self.scaled_background_image.width() >= self.widget_width:
+        if self.scaled_size.width() >= self.widget_width:
             image_x = 0
         else:
-            image_x = (self.widget_width - self.scaled_background_image.width()) // 2
+            image_x = (self.widget_width - self.scaled_size.width()) // 2
 
         return QPoint(image_x, -self.offset_y)
 
-    def render(self, painter: QPainter) -> None:
-        if self.scaled_background_image.isNull():
+    def _tile_width(self) -> int:
+        # Тайл - это полоса на всю ширину, чтобы декодировать реже
+        return self.scaled_size.width()
+
+    def _get_tile(self, column: int, row: int):
+        """Возвращает декодированную полосу фона или None, пока она декодируется в пуле потоков"""
+        key = (column, row)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+        if key in self._pending_tiles:
+            return None
+
+        tile_width = self._tile_width()
+        tile_rect = QRect(column * tile_width, row * self.TILE_SIZE, tile_width, self.TILE_SIZE)
+        tile_rect = tile_rect.intersected(QRect(QPoint(0, 0), self.scaled_size))
+        # Область декодируется в физических пикселях, тайл рисуется в логических координатах
+        ratio = self.device_pixel_ratio
+        pixel_width = self._pixel_width()
+        device_rect = QRect(round(tile_rect.x() * ratio), round(tile_rect.y() * ratio),
+                            round(tile_rect.width() * ratio), round(tile_rect.height() * ratio))
+        device_rect = device_rect.intersected(QRect(QPoint(0, 0), self.image_cache.scaled_size(pixel_width)))
+        if self.asynchronous:
+            # PNG и другие форматы без декодирования по областям читают для каждой полосы
+            # весь файл - в paintEvent это заметная пауза
+            self._pending_tiles.add(key)
+            self.loader.decode_region(self.image_cache, pixel_width, device_rect, (self._tile_generation, key),
+                                      self._is_tile_stale)
+            return None
+        return self._store_tile(key, self.image_cache.decode_region(pixel_width, device_rect))
+
+    def _store_tile(self, key, image: QImage) -> QPixmap:
+        if image.isNull():
+            # Пустой тайл не запрашивается повторно при каждой перерисовке
+            print(f"Ошибка при декодировании области фона {self.image_cache.path}")
+        tile = self._device_pixmap(image)
+        self._tiles[key] = tile
+        while len(self._tiles) > self.max_cached_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def _on_region_ready(self, tag, image: QImage) -> None:
+        generation, key = tag
+        if generation != self._tile_generation:
+            return
+        self._pending_tiles.discard(key)
+        self._store_tile(key, image)
+        self.tile_ready.emit()
+
+    def render(self, painter: QPainter, rect: QRect = None) -> None:
+        if self.scaled_size.isEmpty():
             return
 
         bg_offset = self.get_background_offset()
-        painter.drawPixmap(bg_offset.x(), bg_offset.y(), self.scaled_background_image)
+        image_rect = QRect(bg_offset, self.scaled_size)
+        target = image_rect if rect is None else rect.intersected(image_rect)
+        if target.isEmpty():
+            return
+
+        # Переводим перерисовываемую область в координаты изображения
+        source = target.translated(-bg_offset.x(), -bg_offset.y())
+        if not self.streamed:
+            # Рисуем прямо из общего QPixmap, без копий тайлов в каждом экземпляре;
+            # исходная область задается в физических пикселях изображения
+            ratio = self.scaled_background_image.devicePixelRatio()
+            painter.drawPixmap(QRectF(target), self.scaled_background_image,
+                               QRectF(source.x() * ratio, source.y() * ratio,
+                                      source.width() * ratio, source.height() * ratio))
+            return
+
+        tile_width = self._tile_width()
+        first_column, last_column = source.left() // tile_width, source.right() // tile_width
+        first_row, last_row = source.top() // self.TILE_SIZE, source.bottom() // self.TILE_SIZE
+
+        if self._pending_tiles:
+            visible = {(column, row) for row in range(first_row, last_row + 1)
+                       for column in range(first_column, last_column + 1)}
+            if not self._pending_tiles <= visible:
+                # Прокрутка ушла от запрошенных полос - убираем их из очереди, видимые запросятся заново
+                self.loader.cancel_regions()
+                self._pending_tiles.clear()
+
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                tile = self._get_tile(column, row)
+                if tile is not None:
+                    painter.drawPixmap(bg_offset.x() + column * tile_width,
+                                       bg_offset.y() + row * self.TILE_SIZE, tile)
 
     def handle_resize(self, width: int, height: int) -> None:
         self.widget_width = width
-        self.widget_height = height
\ No newline at end of file
+        self.widget_height = height
@@ -0,0 +1,260 @@
+# batch_renderer.py
+"""Пакетная отрисовка заполненных форм в изображения или PDF без виджетов
+
+Фон и значения полей рисуются через FieldPainter прямо на QImage/QPdfWriter.
+Записи читаются потоково из CSV или JSONL и распределяются по процессам;
+каждый процесс один раз разбирает шаблон и масштабирует фон.
+
+    python batch_renderer.py template.xml background.png records.csv out/ --width 1152 --format pdf
+
+Координаты полей шаблона задаются относительно фона, масштабированного до
+ширины, с которой его показывает DListPerson (3/5 ширины экрана), поэтому
+--width обязателен: при другой ширине поля окажутся не на своих местах. Файлы называются
+по порядковому номеру записи, поэтому порядок результатов не зависит от того,
+какой процесс и когда отрисовал запись.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Состояние процесса-исполнителя: шаблон, фон и рисовальщик создаются один раз
+_worker = None
+
+
+class _WorkerState:
+    def __init__(self, template_path: str, background_path: str, width: int, output_format: str) -> None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PySide6.QtGui import QGuiApplication
+        from background_cache import BackgroundImageCache
+        from field_painter import FieldPainter
+        from xml_field_reader import XMLFieldReader
+
+        # Шрифтам нужен экземпляр QGuiApplication
+        self.app = QGuiApplication.instance() or QGuiApplication([])
+        self.fields = XMLFieldReader().read_fields_from_xml(template_path)
+        self.painter = FieldPainter()
+        self.output_format = output_format
+
+        cache = BackgroundImageCache(background_path)
+        if not cache.open():
+            raise RuntimeError(f"Ошибка при загрузке фона {background_path}: {cache.error_string}")
+        self.background = cache.scaled(width)
+        if self.background.isNull():
+            raise RuntimeError(f"Ошибка при загрузке фона {background_path}: {cache.error_string}")
+
+
+def _init_worker(template_path: str, background_path: str, width: int, output_format: str) -> None:
+    global _worker
+    _worker = _WorkerState(template_path, background_path, width, output_format)
+
+
+# Предупреждения о недопустимых значениях выводятся один раз на поле и значение
+_warned: set = set()
+
+
+def field_value(field_data, record: dict):
+    """Значение поля из записи; отсутствующее или недопустимое значение заменяется значением по умолчанию, как у виджета"""
+    value = record.get(field_data.field_id)
+    if field_data.widget_type == "checkbox":
+        if isinstance(value, str):
+            return value.strip().lower() in ("true", "1", "yes")
+        return bool(value)
+    if field_data.widget_type == "combo_box":
+        if value is not None and str(value) in field_data.options:
+            return str(value)
+        if value not in (None, "") and (field_data.field_id, str(value)) not in _warned:
+            # Виджет тоже отклоняет значения не из списка
+            _warned.add((field_data.field_id, str(value)))
+            print(f"Предупреждение: значение \"{value}\" поля {field_data.field_id} отсутствует в списке, "
+                  f"используется значение по умолчанию")
+        if field_data.default_text in field_data.options:
+            return field_data.default_text
+        return field_data.options[0] if field_data.options else ""
+    if value is None:
+        return field_data.default_text
+    return str(value)
+
+
+def _paint_form(painter, state, record: dict) -> None:
+    painter.drawImage(0, 0, state.background)
+    for field_data in state.fields:
+        state.painter.paint_field(painter, field_data, field_data.x, field_data.y, field_value(field_data, record))
+
+
+def _render_record(task: tuple) -> tuple:
+    """Рисует одну запись; возвращает (номер, путь, время отрисовки в мс, ошибка)"""
+    from PySide6.QtCore import QMarginsF, QSizeF
+    from PySide6.QtGui import QImage, QPainter, QPageSize, QPdfWriter
+
+    index, record, output_path = task
+    state = _worker
+    started = time.perf_counter()
+    try:
+        if state.output_format == "pdf":
+            size = state.background.size()
+            writer = QPdfWriter(output_path)
+            # Одна страница размером с фон, 96 точек на дюйм как у экрана
+            writer.setResolution(96)
+            writer.setPageSize(QPageSize(QSizeF(size.width() * 72 / 96, size.height() * 72 / 96),
+                                         QPageSize.Unit.Point))
+            writer.setPageMargins(QMarginsF(0, 0, 0, 0))
+            painter = QPainter(writer)
+            _paint_form(painter, state, record)
+            painter.end()
+        else:
+            image = QImage(state.background.size(), QImage.Format_RGB32)
+            painter = QPainter(image)
+            _paint_form(painter, state, record)
+            painter.end()
+            if not image.save(output_path):
+                raise OSError(f"не удалось сохранить {output_path}")
+        error = ""
+    except Exception as e:
+        error = str(e)
+    return index, output_path, (time.perf_counter() - started) * 1000, error
+
+
+def iter_records(records_path: str):
+    """Потоково читает записи из CSV (с заголовком) или JSONL"""
+    if records_path.lower().endswith((".jsonl", ".ndjson")):
+        with open(records_path, encoding="utf-8") as records_file:
+            for line in records_file:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    else:
+        with open(records_path, encoding="utf-8", newline="") as records_file:
+            yield from csv.DictReader(records_file)
+
+
+_UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+def _output_path(output_dir: str, index: int, record: dict, name_field: str, extension: str) -> str:
+    name = f"{index:06d}"
+    if name_field and record.get(name_field):
+        name += "_" + _UNSAFE_NAME.sub("_", str(record[name_field]))[:64]
+    return os.path.join(output_dir, f"{name}.{extension}")
+
+
+def _check_inputs(template_path: str, background_path: str) -> None:
+    """Проверяет шаблон и фон до запуска процессов: ошибка в инициализаторе ломает весь пул"""
+    from background_cache import BackgroundImageCache
+    from xml_field_reader import XMLFieldReader
+
+    try:
+        for _ in XMLFieldReader().iter_fields_from_xml(template_path):
+            pass
+    except Exception as e:
+        raise RuntimeError(f"Ошибка при чтении шаблона {template_path}: {e}") from e
+
+    cache = BackgroundImageCache(background_path)
+    if not cache.open():
+        raise RuntimeError(f"Ошибка при загрузке фона {background_path}: {cache.error_string}")
+
+
+def render_batch(template_path: str, background_path: str, records_path: str, output_dir: str,
+                 width: int, output_format: str = "png", workers: int = None,
+                 name_field: str = None, on_result=None) -> dict:
+    """Рисует все записи и возвращает отчет о производительности
+
+    width - ширина фона в DListPerson, к которой привязаны координаты полей.
+    on_result(номер, путь, ошибка) вызывается в порядке записей.
+    """
+    if not width or width <= 0:
+        raise ValueError("Ошибка: не задана ширина фона")
+    _check_inputs(template_path, background_path)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    extension = "pdf" if output_format == "pdf" else output_format
+
+    # Процессы запускаются через spawn: Qt нельзя безопасно копировать через fork
+    context = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    rendered = failed = 0
+    render_ms = 0.0
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(template_path, background_path, width, output_format)) as executor:
+        # Ограниченное окно задач: записи не читаются в память целиком, результаты идут по порядку
+        pending = deque()
+        max_pending = workers * 4
+
+        def collect() -> None:
+            nonlocal rendered, failed, render_ms
+            try:
+                index, path, elapsed_ms, error = pending.popleft().result()
+            except BrokenProcessPool as e:
+                raise RuntimeError(f"Ошибка: процесс отрисовки аварийно завершился ({e})") from e
+            render_ms += elapsed_ms
+            if error:
+                failed += 1
+                print(f"Ошибка при отрисовке записи {index}: {error}")
+            else:
+                rendered += 1
+            if on_result is not None:
+                on_result(index, path, error)
+
+        for index, record in enumerate(iter_records(records_path)):
+            output_path = _output_path(output_dir, index, record, name_field, extension)
+            pending.append(executor.submit(_render_record, (index, record, output_path)))
+            if len(pending) >= max_pending:
+                collect()
+        while pending:
+            collect()
+
+    elapsed = time.perf_counter() - started
+    total = rendered + failed
+    return {
+        "records": total,
+        "rendered": rendered,
+        "failed": failed,
+        "workers": workers,
+        "elapsed_s": elapsed,
+        "records_per_s": total / elapsed if elapsed else 0.0,
+        "mean_render_ms": render_ms / total if total else 0.0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Пакетная отрисовка заполненных форм")
+    parser.add_argument("template", help="XML шаблон полей")
+    parser.add_argument("background", help="фоновое изображение")
+    parser.add_argument("records", help="записи в CSV (с заголовком) или JSONL")
+    parser.add_argument("output_dir", help="каталог для результатов")
+    parser.add_argument("--format", choices=("png", "jpg", "pdf"), default="png")
+    parser.add_argument("--width", type=int, required=True,
+                        help="ширина фона в DListPerson (3/5 ширины экрана), к которой привязаны координаты полей")
+    parser.add_argument("--workers", type=int, help="количество процессов (по умолчанию - число ядер)")
+    parser.add_argument("--name-field", help="поле записи, добавляемое к имени файла")
+    parser.add_argument("--report", help="файл для сохранения отчета в JSON")
+    args = parser.parse_args()
+
+    try:
+        report = render_batch(args.template, args.background, args.records, args.output_dir,
+                              width=args.width, output_format=args.format, workers=args.workers,
+                              name_field=args.name_field)
+    except (RuntimeError, ValueError) as e:
+        print(e)
+        return 1
+
+    print(f"Записей: {report['records']}, ошибок: {report['failed']}, "
+          f"{report['records_per_s']:.1f} записей/с, {report['mean_render_ms']:.1f} мс на запись, "
+          f"процессов: {report['workers']}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=2)
+
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+# benchmark.py
+"""Бенчмарки загрузки, прокрутки, изменения размера и доступа к значениям полей
+
+Запускается без экрана на платформе Qt offscreen:
+
+    python benchmark.py --output results.json
+    python benchmark.py --baseline baseline.json --tolerance 0.2
+
+Синтетические шаблоны полей и фоновые изображения генерируются во временном
+каталоге. При сравнении с базовым файлом код возврата равен 1, если медиана
+хотя бы одного замера выросла больше чем на tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import PySide6
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QImage, QPainter, QColor, QLinearGradient
+from PySide6.QtCore import QEvent
+
+from DListPerson import DListPerson
+
+
+FIELD_TYPES = ("label", "line_edit", "text_edit", "checkbox", "combo_box")
+IMAGE_WIDTH = 1600
+WIDGET_SIZE = (1000, 800)
+
+
+def generate_fields_xml(path: str, count: int, columns: int = 4) -> None:
+    """Создает шаблон из count полей, уложенных сеткой"""
+    root = ET.Element("fields")
+    for index in range(count):
+        widget_type = FIELD_TYPES[index % len(FIELD_TYPES)]
+        field = ET.SubElement(root, "field")
+        values = {
+            "type": widget_type,
+            "x": 40 + (index % columns) * 260,
+            "y": 40 + (index // columns) * 45,
+            "width": 240,
+            "height": 80 if widget_type == "text_edit" else 30,
+            "default_text": f"Поле {index}",
+            "font_size": 12,
+            "field_id": f"field_{index}",
+        }
+        for tag, value in values.items():
+            ET.SubElement(field, tag).text = str(value)
+        if widget_type == "combo_box":
+            options = ET.SubElement(field, "options")
+            for option in range(5):
+                ET.SubElement(options, "option").text = f"Вариант {option}"
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def generate_background(path: str, height: int) -> None:
+    """Создает фоновое изображение с градиентом и горизонтальными линиями"""
+    image = QImage(IMAGE_WIDTH, height, QImage.Format_RGB32)
+    painter = QPainter(image)
+    gradient = QLinearGradient(0, 0, 0, height)
+    gradient.setColorAt(0, QColor(250, 250, 245))
+    gradient.setColorAt(1, QColor(210, 220, 235))
+    painter.fillRect(image.rect(), gradient)
+    painter.setPen(QColor(180, 180, 180))
+    for y in range(0, height, 45):
+        painter.drawLine(0, y, IMAGE_WIDTH, y)
+    painter.end()
+    image.save(path, "PNG")
+
+
+class BenchmarkRunner:
+    def __init__(self, app: QApplication, work_dir: str, repeat: int) -> None:
+        self.app = app
+        self.work_dir = work_dir
+        self.repeat = repeat
+        self.results: dict = {}
+
+    def _record(self, name: str, samples: list, per_operation: int = 1) -> None:
+        samples = [sample / per_operation for sample in samples]
+        self.results[name] = {
+            "median_ms": statistics.median(samples),
+            "min_ms": min(samples),
+            "max_ms": max(samples),
+            "runs": len(samples),
+        }
+        print(f"{name:40s} {self.results[name]['median_ms']:10.3f} мс")
+
+    def _create_widget(self) -> DListPerson:
+        widget = DListPerson()
+        # Фон загружается синхронно, чтобы замер включал декодирование и масштабирование
+        widget.background_renderer.set_asynchronous(False)
+        widget.resize(*WIDGET_SIZE)
+        widget.show()
+        self.app.processEvents()
+        return widget
+
+    def _destroy_widget(self, widget: DListPerson) -> None:
+        widget.close()
+        widget.deleteLater()
+        QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        self.app.processEvents()
+
+    def _measure(self, action) -> float:
+        started = time.perf_counter()
+        action()
+        self.app.processEvents()
+        return (time.perf_counter() - started) * 1000
+
+    def bench_set_fields(self, xml_path: str, count: int) -> None:
+        samples = []
+        for _ in range(self.repeat):
+            widget = self._create_widget()
+            samples.append(self._measure(lambda: widget.set_fields(xml_path)))
+            self._destroy_widget(widget)
+        self._record(f"set_fields/{count}", samples)
+
+    def bench_set_background(self, image_path: str, height: int) -> None:
+        samples = []
+        for _ in range(self.repeat):
+            widget = self._create_widget()
+            samples.append(self._measure(lambda: widget.set_background_image(image_path)))
+            self._destroy_widget(widget)
+        self._record(f"set_background_image/{height}", samples)
+
+    def _prepared_widget(self, xml_path: str, image_path: str) -> DListPerson:
+        widget = self._create_widget()
+        widget.set_background_image(image_path)
+        widget.set_fields(xml_path)
+        self.app.processEvents()
+        return widget
+
+    def bench_scroll(self, xml_path: str, image_path: str, name: str, step: int = 40) -> None:
+        """Прокрутка по всей высоте с синхронной перерисовкой на каждом шаге"""
+        widget = self._prepared_widget(xml_path, image_path)
+        scrollbar = widget.scrollbar_renderer
+        offsets = list(range(0, scrollbar.max_offset_y + 1, step)) or [0]
+
+        def sweep() -> None:
+            for offset in offsets:
+                scrollbar.set_offset(offset)
+                scrollbar.flush()
+                widget.repaint()
+
+        samples = [self._measure(sweep) for _ in range(self.repeat)]
+        self._destroy_widget(widget)
+        self._record(f"scroll_frame/{name}", samples, len(offsets))
+
+    def bench_resize(self, xml_path: str, image_path: str, name: str, steps: int = 40) -> None:
+        """Серия изменений размера, как при перетаскивании края окна"""
+        widget = self._prepared_widget(xml_path, image_path)
+        width, height = WIDGET_SIZE
+        sizes = [(width - 200 + (index * 400) // steps, height - 100 + (index * 200) // steps)
+                 for index in range(steps)]
+
+        def storm() -> None:
+            for size in sizes:
+                widget.resize(*size)
+                self.app.processEvents()
+
+        samples = [self._measure(storm) for _ in range(self.repeat)]
+        self._destroy_widget(widget)
+        self._record(f"resize/{name}", samples, len(sizes))
+
+    def bench_values(self, xml_path: str, count: int) -> None:
+        widget = self._create_widget()
+        widget.set_fields(xml_path)
+        field_ids = [f"field_{index}" for index in range(count)]
+
+        def read_all() -> None:
+            for field_id in field_ids:
+                widget.get_field_value(field_id)
+
+        def write_all() -> None:
+            for index, field_id in enumerate(field_ids):
+                widget.set_field_value(field_id, f"Значение {index}")
+
+        self._record(f"get_field_value/{count}", [self._measure(read_all) for _ in range(self.repeat)])
+        self._record(f"set_field_value/{count}", [self._measure(write_all) for _ in range(self.repeat)])
+
+        mapping = {field_id: f"Запись {index}" for index, field_id in enumerate(field_ids)}
+        self._record(f"get_all_values/{count}", [self._measure(widget.get_all_values) for _ in range(self.repeat)])
+        self._record(f"set_values/{count}",
+                     [self._measure(lambda: widget.set_values(mapping)) for _ in range(self.repeat)])
+        self._destroy_widget(widget)
+
+    def run(self, field_counts: list, image_heights: list) -> dict:
+        xml_paths = {}
+        for count in field_counts:
+            xml_paths[count] = os.path.join(self.work_dir, f"fields_{count}.xml")
+            generate_fields_xml(xml_paths[count], count)
+
+        image_paths = {}
+        for height in image_heights:
+            image_paths[height] = os.path.join(self.work_dir, f"background_{height}.png")
+            generate_background(image_paths[height], height)
+
+        for count in field_counts:
+            self.bench_set_fields(xml_paths[count], count)
+        for height in image_heights:
+            self.bench_set_background(image_paths[height], height)
+
+        # Прокрутка и ресайз - на самом большом шаблоне для каждой высоты фона
+        largest = max(field_counts)
+        for height in image_heights:
+            name = f"{largest}x{height}"
+            self.bench_scroll(xml_paths[largest], image_paths[height], name)
+            self.bench_resize(xml_paths[largest], image_paths[height], name)
+
+        for count in field_counts:
+            self.bench_values(xml_paths[count], count)
+
+        return self.results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Сравнивает медианы с базовыми, возвращает список регрессий"""
+    regressions = []
+    print(f"\n{'замер':40s} {'база, мс':>10s} {'сейчас, мс':>10s} {'изменение':>10s}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:40s} {'-':>10s} {result['median_ms']:10.3f}")
+            continue
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        marker = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            marker = "  РЕГРЕССИЯ"
+        print(f"{name:40s} {base['median_ms']:10.3f} {result['median_ms']:10.3f} {(ratio - 1) * 100:+9.1f}%{marker}")
+    return regressions
+
+
+def parse_sizes(text: str) -> list:
+    return [int(value) for value in text.split(",") if value]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки DListPerson на платформе Qt offscreen")
+    parser.add_argument("--fields", type=parse_sizes, default=[100, 1000, 10000],
+                        help="количество полей в шаблонах через запятую")
+    parser.add_argument("--heights", type=parse_sizes, default=[2000, 8000, 20000],
+                        help="высоты фоновых изображений через запятую")
+    parser.add_argument("--repeat", type=int, default=5, help="количество повторов каждого замера")
+    parser.add_argument("--output", help="файл для сохранения результатов в JSON")
+    parser.add_argument("--baseline", help="файл результатов для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="допустимый относительный рост медианы (0.2 - 20%%)")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory(prefix="dlistperson-bench-") as work_dir:
+        results = BenchmarkRunner(app, work_dir, args.repeat).run(args.fields, args.heights)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pyside": PySide6.__version__,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        if regressions:
+            print(f"\nРегрессии: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
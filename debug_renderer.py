@@ -1,6 +1,6 @@
 # debug_renderer.py
-from PySide6.QtCore import QPoint
-from PySide6.QtGui import QPainter, QPen, QColor, QFont, QFontMetrics
+from PySide6.QtCore import QPoint, QRect, QTimer
+from PySide6.QtGui import QPainter, QPen, QColor, QFont, QFontMetrics, QRegion
 from PySide6.QtCore import Qt
 from renderer_interface import RendererInterface
 
@@ -12,57 +12,177 @@ class DebugRenderer(RendererInterface):
         self.debug_mode: bool = False
         self.debug_mouse_pos: QPoint = QPoint(0, 0)
 
+        # Ресурсы отрисовки создаются один раз
+        self._cross_pen = QPen(QColor(255, 0, 0, 180))
+        self._cross_pen.setWidth(1)
+        self._cross_pen.setStyle(Qt.DashLine)
+        self._text_pen = QPen(QColor(255, 255, 255))
+        self._label_background = QColor(0, 0, 0, 180)
+        self._hover_pen = QPen(QColor(0, 120, 255, 220))
+        self._hover_pen.setWidth(2)
+        self._metrics_font: QFont = None
+        self._font_metrics: QFontMetrics = None
+
+        # Область, которую нужно перерисовать после перемещения курсора
+        self._dirty_region = QRegion()
+
+        # Оверлей производительности обновляется по таймеру, а не на каждый кадр
+        self.perf_hud: bool = False
+        self.perf_counters = None
+        self._hud_rect: QRect = QRect()
+        self._hud_timer = QTimer(self)
+        self._hud_timer.setInterval(250)
+        self._hud_timer.timeout.connect(self._refresh_hud)
+
     def set_debug_mode(self, enabled: bool) -> None:
         self.debug_mode = enabled
 
+    def set_perf_hud(self, enabled: bool, perf_counters=None) -> None:
+        """Включает оверлей производительности, читающий значения из perf_counters"""
+        if perf_counters is not None:
+            self.perf_counters = perf_counters
+        self.perf_hud = enabled and self.perf_counters is not None
+        if self.perf_hud:
+            self._hud_timer.start()
+        else:
+            self._hud_timer.stop()
+            self._hud_rect = QRect()
+
+    def _refresh_hud(self) -> None:
+        if self._hud_rect.isEmpty():
+            self.parent.update()
+        else:
+            self.parent.update(self._hud_rect)
+
     def set_mouse_position(self, pos: QPoint) -> None:
+        if self.debug_mode:
+            # Стираем перекрестие в старой позиции и рисуем в новой
+            self._dirty_region += self._overlay_region(self.debug_mouse_pos)
+            self._dirty_region += self._overlay_region(pos)
         self.debug_mouse_pos = pos
 
-    def render(self, painter: QPainter) -> None:
+    def take_dirty_region(self) -> QRegion:
+        region = self._dirty_region
+        self._dirty_region = QRegion()
+        return region
+
+    def _overlay_region(self, pos: QPoint) -> QRegion:
+        """Область, занимаемая перекрестием и подписью для позиции курсора pos"""
+        # Запас в пиксель с каждой стороны линии
+        region = QRegion(pos.x() - 1, 0, 3, self.parent.height())
+        region += QRegion(0, pos.y() - 1, self.parent.width(), 3)
+        region += QRegion(self._label_rect(pos, self._coord_text(pos)).adjusted(-1, -1, 1, 1))
+        hover_rect = self._hover_rect(pos)
+        if hover_rect is not None:
+            region += QRegion(hover_rect.adjusted(-2, -2, 2, 2))
+        return region
+
+    def _hover_rect(self, pos: QPoint):
+        """Рамка вокруг поля под курсором в координатах виджета или None"""
+        fields_renderer = self.parent.fields_renderer
+        field_id = fields_renderer.field_at(pos)
+        if field_id is None:
+            return None
+        # Рамка рисуется снаружи поля, чтобы ее не закрывал виджет
+        return fields_renderer.field_rect(field_id).adjusted(-2, -2, 1, 1)
+
+    def _get_font_metrics(self) -> QFontMetrics:
+        font = self.parent.font()
+        if self._font_metrics is None or font != self._metrics_font:
+            self._metrics_font = QFont(font)
+            self._font_metrics = QFontMetrics(font)
+        return self._font_metrics
+
+    def _coord_text(self, pos: QPoint) -> str:
+        # Вычисляем абсолютные координаты
+        abs_coords = self.parent.get_absolute_coordinates(pos.x(), pos.y())
+        coord_text = f"X: {abs_coords.x()}, Y: {abs_coords.y()}\nWidget: {pos.x()}, {pos.y()}"
+        field_id = self.parent.fields_renderer.field_at(pos)
+        if field_id is not None:
+            coord_text += f"\nField: {field_id}"
+        return coord_text
+
+    def _label_rect(self, pos: QPoint, coord_text: str) -> QRect:
+        """Прямоугольник подписи с координатами"""
+        text_rect = self._get_font_metrics().boundingRect(coord_text)
+        text_rect.adjust(-2, -8, 2, 8)
+
+        # Позиционируем текст
+        text_pos = QPoint(pos.x() + 10, pos.y() - text_rect.height() - 10)
+
+        if text_pos.x() + text_rect.width() > self.parent.width():
+            text_pos.setX(pos.x() - text_rect.width() - 10)
+
+        if text_pos.y() < 0:
+            text_pos.setY(pos.y() + 20)
+
+        text_rect.moveTo(text_pos)
+        return text_rect
+
+    def render(self, painter: QPainter, rect: QRect = None) -> None:
+        if not (self.perf_hud or self.debug_mode):
+            return
+        # Размеры подписей считаются по шрифту виджета - им же они и рисуются
+        painter.setFont(self.parent.font())
+        if self.perf_hud:
+            self._draw_perf_hud(painter)
+
         if not self.debug_mode:
             return
 
         self._draw_debug_info(painter)
 
+    def _hud_text(self) -> str:
+        perf = self.perf_counters
+        live, visible, total = self.parent.fields_renderer.field_counts()
+        memory_mb = self.parent.background_renderer.memory_usage() / (1024 * 1024)
+        return "\n".join((
+            f"Кадр: {perf.average('frame'):.2f} мс (макс. {perf.maximum('frame'):.2f}), FPS: {perf.fps():.1f}",
+            f"Фон: {perf.average('paint.background'):.2f} мс, поля: {perf.average('paint.fields'):.2f} мс, "
+            f"отладка: {perf.average('paint.debug'):.2f} мс",
+            f"update_positions: {perf.average('update_positions'):.2f} мс, "
+            f"setGeometry за кадр: {perf.average('set_geometry'):.1f}",
+            f"Поля: виджетов {live}, видимых {visible}, всего {total}",
+            f"Память фона: {memory_mb:.1f} МБ",
+        ))
+
+    def _draw_perf_hud(self, painter: QPainter) -> None:
+        """Рисует оверлей производительности в левом верхнем углу"""
+        hud_text = self._hud_text()
+        text_rect = self._get_font_metrics().boundingRect(QRect(0, 0, self.parent.width(), self.parent.height()),
+                                                          Qt.AlignLeft, hud_text)
+        text_rect.adjust(-6, -4, 6, 4)
+        text_rect.moveTo(10, 10)
+        # Область перерисовки по таймеру покрывает и прошлый, и новый размер оверлея
+        self._hud_rect = self._hud_rect.united(text_rect) if not self._hud_rect.isEmpty() else text_rect
+
+        painter.fillRect(text_rect, self._label_background)
+        painter.setPen(self._text_pen)
+        painter.drawText(text_rect.adjusted(6, 4, -6, -4), Qt.AlignLeft, hud_text)
+
     def _draw_debug_info(self, painter: QPainter) -> None:
         """Рисует отладочную информацию"""
-        cross_pen = QPen(QColor(255, 0, 0, 180))
-        cross_pen.setWidth(1)
-        cross_pen.setStyle(Qt.DashLine)
-        painter.setPen(cross_pen)
+        # Подсвечиваем поле под курсором
+        hover_rect = self._hover_rect(self.debug_mouse_pos)
+        if hover_rect is not None:
+            painter.setPen(self._hover_pen)
+            painter.drawRect(hover_rect)
+
+        painter.setPen(self._cross_pen)
 
         # Рисуем перекрестие
         painter.drawLine(self.debug_mouse_pos.x(), 0, self.debug_mouse_pos.x(), self.parent.height())
         painter.drawLine(0, self.debug_mouse_pos.y(), self.parent.width(), self.debug_mouse_pos.y())
 
-        # Вычисляем абсолютные координаты
-        abs_coords = self.parent.get_absolute_coordinates(self.debug_mouse_pos.x(), self.debug_mouse_pos.y())
-
-        # Подготавливаем текст
-        coord_text = f"X: {abs_coords.x()}, Y: {abs_coords.y()}\nWidget: {self.debug_mouse_pos.x()}, {self.debug_mouse_pos.y()}"
-
-        # Настраиваем фон для текста
-        font_metrics = QFontMetrics(painter.font())
-        text_rect = font_metrics.boundingRect(coord_text)
-        text_rect.adjust(-2, -8, 2, 8)
-
-        # Позиционируем текст
-        text_pos = QPoint(self.debug_mouse_pos.x() + 10, self.debug_mouse_pos.y() - text_rect.height() - 10)
-
-        if text_pos.x() + text_rect.width() > self.parent.width():
-            text_pos.setX(self.debug_mouse_pos.x() - text_rect.width() - 10)
-
-        if text_pos.y() < 0:
-            text_pos.setY(self.debug_mouse_pos.y() + 20)
-
-        text_rect.moveTo(text_pos)
+        # Подготавливаем текст и его фон
+        coord_text = self._coord_text(self.debug_mouse_pos)
+        text_rect = self._label_rect(self.debug_mouse_pos, coord_text)
 
         # Рисуем фон и текст
-        painter.fillRect(text_rect, QColor(0, 0, 0, 180))
-        text_pen = QPen(QColor(255, 255, 255))
-        painter.setPen(text_pen)
+        painter.fillRect(text_rect, self._label_background)
+        painter.setPen(self._text_pen)
         painter.drawText(text_rect, Qt.AlignCenter, coord_text)
 
     def handle_resize(self, width: int, height: int) -> None:
         # Для DebugRenderer ресайз не требует специальной обработки
-        pass
\ No newline at end of file
+        pass
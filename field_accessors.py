@@ -0,0 +1,60 @@
+# field_accessors.py
+from PySide6.QtWidgets import QLabel, QLineEdit, QTextEdit, QCheckBox, QComboBox
+
+
+class FieldAccessor:
+    """Функции чтения и записи значения виджета и имя сигнала его изменения"""
+    __slots__ = ("getter", "setter", "signal")
+
+    def __init__(self, getter, setter, signal: str = None) -> None:
+        self.getter = getter
+        self.setter = setter
+        self.signal = signal
+
+
+def _set_check_state(widget: QCheckBox, value) -> None:
+    widget.setChecked(bool(value))
+
+
+def _set_combo_text(widget: QComboBox, value) -> None:
+    index = widget.findText(value)
+    if index >= 0:
+        widget.setCurrentIndex(index)
+
+
+# Класс виджета -> аксессор; для подклассов выбирается ближайший класс по MRO
+_registry: dict = {
+    QLineEdit: FieldAccessor(QLineEdit.text, QLineEdit.setText, "textChanged"),
+    QTextEdit: FieldAccessor(QTextEdit.toPlainText, QTextEdit.setPlainText, "textChanged"),
+    QLabel: FieldAccessor(QLabel.text, QLabel.setText),
+    QCheckBox: FieldAccessor(QCheckBox.isChecked, _set_check_state, "toggled"),
+    QComboBox: FieldAccessor(QComboBox.currentText, _set_combo_text, "currentTextChanged"),
+}
+# Результаты поиска по MRO для конкретных классов (включая отсутствие аксессора)
+_resolved: dict = {}
+
+
+def register_value_accessor(widget_class: type, getter, setter, signal: str = None) -> None:
+    """Регистрирует функции getter(widget) и setter(widget, value) для класса виджета
+
+    signal - имя сигнала, которым виджет сообщает о правке значения пользователем.
+    """
+    _registry[widget_class] = FieldAccessor(getter, setter, signal)
+    _resolved.clear()
+
+
+def resolve_accessor(widget):
+    """Возвращает аксессор для виджета или None, если класс не поддерживается"""
+    widget_class = type(widget)
+    try:
+        return _resolved[widget_class]
+    except KeyError:
+        pass
+
+    accessor = None
+    for base in widget_class.__mro__:
+        accessor = _registry.get(base)
+        if accessor is not None:
+            break
+    _resolved[widget_class] = accessor
+    return accessor
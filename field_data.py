@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class FieldData:
     """Расширенный класс для хранения данных о поле"""
     widget_type: str = "label"  # "label", "line_edit", "text_edit", "checkbox", "combo_box", "custom"
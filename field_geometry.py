@@ -0,0 +1,183 @@
+# field_geometry.py
+from array import array
+from bisect import bisect_left
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class FieldGeometryTable:
+    """Геометрия полей в виде столбцов (x, y, width, height) с сортировкой по вертикали
+
+    Строки хранятся в массивах array('i'); при наличии NumPy расчет абсолютных
+    координат видимых полей выполняется векторно. Для каждой строки запоминается
+    последний примененный прямоугольник, чтобы setGeometry вызывался только для
+    изменившихся полей.
+    """
+
+    # Значение, заведомо отличающееся от любой координаты - прямоугольник не применен
+    NOT_APPLIED = -2 ** 31
+
+    def __init__(self) -> None:
+        self._ids: list = []
+        self._rows: dict = {}
+        self.x = array("i")
+        self.y = array("i")
+        self.width = array("i")
+        self.height = array("i")
+        self._applied_x = array("i")
+        self._applied_y = array("i")
+
+        # Строки, упорядоченные по y, перестраиваются лениво после изменений
+        self._order = array("i")
+        self._sorted_y: list = []
+        self._order_dirty: bool = False
+        self._max_height: int = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, field_id) -> bool:
+        return field_id in self._rows
+
+    def add(self, field_id: str, x: int, y: int, width: int, height: int) -> None:
+        """Добавляет поле (существующая запись обновляется)"""
+        if field_id in self._rows:
+            self.update(field_id, x, y, width, height)
+            return
+
+        self._rows[field_id] = len(self._ids)
+        self._ids.append(field_id)
+        self.x.append(x)
+        self.y.append(y)
+        self.width.append(width)
+        self.height.append(height)
+        self._applied_x.append(self.NOT_APPLIED)
+        self._applied_y.append(self.NOT_APPLIED)
+        self._max_height = max(self._max_height, height)
+        self._order_dirty = True
+
+    def update(self, field_id: str, x: int, y: int, width: int, height: int) -> None:
+        """Изменяет геометрию существующего поля"""
+        row = self._rows[field_id]
+        if self.y[row] != y:
+            self._order_dirty = True
+        self.x[row] = x
+        self.y[row] = y
+        self.width[row] = width
+        self.height[row] = height
+        self._applied_x[row] = self.NOT_APPLIED
+        self._max_height = max(self._max_height, height)
+
+    def remove(self, field_id: str) -> None:
+        """Удаляет поле, перенося последнюю строку на его место"""
+        row = self._rows.pop(field_id, None)
+        if row is None:
+            return
+
+        last = len(self._ids) - 1
+        if row != last:
+            moved_id = self._ids[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+            for column in (self.x, self.y, self.width, self.height, self._applied_x, self._applied_y):
+                column[row] = column[last]
+
+        self._ids.pop()
+        for column in (self.x, self.y, self.width, self.height, self._applied_x, self._applied_y):
+            column.pop()
+        self._order_dirty = True
+
+    def clear(self) -> None:
+        self._ids.clear()
+        self._rows.clear()
+        for column in (self.x, self.y, self.width, self.height, self._applied_x, self._applied_y, self._order):
+            del column[:]
+        self._sorted_y = []
+        self._order_dirty = False
+        self._max_height = 0
+
+    def rect(self, field_id: str) -> tuple[int, int, int, int]:
+        row = self._rows[field_id]
+        return self.x[row], self.y[row], self.width[row], self.height[row]
+
+    def invalidate(self, field_id: str) -> None:
+        """Сбрасывает запомненный прямоугольник (например, после скрытия виджета)"""
+        row = self._rows.get(field_id)
+        if row is not None:
+            self._applied_x[row] = self.NOT_APPLIED
+
+    def invalidate_all(self) -> None:
+        for row in range(len(self._ids)):
+            self._applied_x[row] = self.NOT_APPLIED
+
+    def _rebuild_order(self) -> None:
+        count = len(self._ids)
+        if np is not None and count:
+            ys = np.frombuffer(self.y, dtype=np.int32)
+            order = np.argsort(ys, kind="stable").astype(np.int32)
+            self._sorted_y = ys[order].tolist()
+            self._order = array("i", order.tobytes())
+        else:
+            y = self.y
+            order = sorted(range(count), key=y.__getitem__)
+            self._sorted_y = [y[row] for row in order]
+            self._order = array("i", order)
+        self._order_dirty = False
+
+    def query(self, top: int, bottom: int) -> list:
+        """Возвращает id полей, пересекающих полосу [top, bottom)"""
+        if self._order_dirty:
+            self._rebuild_order()
+
+        # Поле может начинаться выше top не более чем на максимальную высоту
+        start = bisect_left(self._sorted_y, top - self._max_height)
+        end = bisect_left(self._sorted_y, bottom)
+
+        y, height, ids = self.y, self.height, self._ids
+        return [ids[row] for row in self._order[start:end] if y[row] + height[row] > top]
+
+    def changed_rects(self, field_ids: list, offset_x: int, offset_y: int) -> list:
+        """Вычисляет абсолютные прямоугольники полей и возвращает только изменившиеся
+
+        Результат - список (field_id, x, y, width, height); изменившиеся
+        прямоугольники запоминаются как примененные.
+        """
+        if not field_ids:
+            return []
+
+        rows_map = self._rows
+        if np is not None and len(field_ids) > 16:
+            rows = np.fromiter((rows_map[field_id] for field_id in field_ids), dtype=np.intp, count=len(field_ids))
+            xs = np.frombuffer(self.x, dtype=np.int32)[rows] + offset_x
+            ys = np.frombuffer(self.y, dtype=np.int32)[rows] - offset_y
+            applied_x = np.frombuffer(self._applied_x, dtype=np.int32)
+            applied_y = np.frombuffer(self._applied_y, dtype=np.int32)
+
+            changed = np.nonzero((applied_x[rows] != xs) | (applied_y[rows] != ys))[0]
+            changed_rows = rows[changed]
+            applied_x[changed_rows] = xs[changed]
+            applied_y[changed_rows] = ys[changed]
+
+            width, height = self.width, self.height
+            result = [(field_ids[i], ax, ay, width[row], height[row])
+                      for i, row, ax, ay in zip(changed.tolist(), changed_rows.tolist(),
+                                                xs[changed].tolist(), ys[changed].tolist())]
+            # Представления массивов должны освободиться до следующего изменения размеров столбцов
+            del applied_x, applied_y
+            return result
+
+        result = []
+        x, y, width, height = self.x, self.y, self.width, self.height
+        applied_x, applied_y = self._applied_x, self._applied_y
+        for field_id in field_ids:
+            row = rows_map[field_id]
+            ax = x[row] + offset_x
+            ay = y[row] - offset_y
+            if applied_x[row] != ax or applied_y[row] != ay:
+                applied_x[row] = ax
+                applied_y[row] = ay
+                result.append((field_id, ax, ay, width[row], height[row]))
+        return result
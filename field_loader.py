@@ -0,0 +1,98 @@
+# field_loader.py
+import heapq
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+from field_data import FieldData
+from profiler import profiler
+
+
+class IncrementalFieldLoader(QObject):
+    """Создает поля частями в цикле событий, начиная с ближайших к видимой области"""
+    progress = Signal(int)  # количество созданных полей
+    finished = Signal(int)
+
+    def __init__(self, field_manager, parent=None) -> None:
+        super().__init__(parent)
+        self.field_manager = field_manager
+        # Бюджет времени на один кадр, мс
+        self.frame_budget_ms: float = 8.0
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._process_slice)
+
+        self._source = None
+        self._pending: list = []
+        self._sequence: int = 0
+        self._created: int = 0
+        self._viewport: tuple[int, int] = (0, 0)
+        self._heap_viewport: tuple[int, int] = (0, 0)
+
+    def start(self, fields) -> None:
+        """Начинает загрузку из итерируемого источника FieldData"""
+        self.stop()
+        self._source = iter(fields)
+        self._created = 0
+        self._timer.start()
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self._source = None
+        self._pending.clear()
+
+    def is_running(self) -> bool:
+        return self._timer.isActive()
+
+    def set_viewport(self, top: int, bottom: int) -> None:
+        """Задает видимую полосу в координатах фона"""
+        self._viewport = (top, bottom)
+
+    def _distance(self, field_data: FieldData) -> int:
+        top, bottom = self._viewport
+        if field_data.y + field_data.height <= top:
+            return top - field_data.y - field_data.height
+        if field_data.y >= bottom:
+            return field_data.y - bottom
+        return 0
+
+    def _push(self, field_data: FieldData) -> None:
+        # Порядковый номер сохраняет порядок документа при равном расстоянии
+        heapq.heappush(self._pending, (self._distance(field_data), self._sequence, field_data))
+        self._sequence += 1
+
+    @profiler.profiled("fields.load_slice")
+    def _process_slice(self) -> None:
+        start = time.perf_counter()
+        budget = self.frame_budget_ms / 1000
+
+        # Разбор дешевле создания виджетов - на него отводится половина бюджета
+        while self._source is not None and time.perf_counter() - start < budget / 2:
+            try:
+                field_data = next(self._source)
+            except StopIteration:
+                self._source = None
+                break
+            except Exception as e:
+                print(f"Ошибка при чтении XML: {e}")
+                self._source = None
+                break
+            self._push(field_data)
+
+        # Видимая область сместилась - пересчитываем приоритеты
+        if self._viewport != self._heap_viewport:
+            self._pending = [(self._distance(item[2]), item[1], item[2]) for item in self._pending]
+            heapq.heapify(self._pending)
+            self._heap_viewport = self._viewport
+
+        created_before = self._created
+        while self._pending and time.perf_counter() - start < budget:
+            _, _, field_data = heapq.heappop(self._pending)
+            self.field_manager.create_field(field_data)
+            self._created += 1
+
+        if self._created != created_before:
+            self.progress.emit(self._created)
+
+        if self._source is None and not self._pending:
+            self._timer.stop()
+            self.finished.emit(self._created)
@@ -1,7 +1,33 @@
 # field_manager.py
-from PySide6.QtWidgets import QWidget, QLabel, QLineEdit, QTextEdit, QCheckBox, QComboBox
+from dataclasses import replace
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import QObject, QEvent, QPoint, QRect, Qt
 from widget_factory import DefaultWidgetFactory
+from field_accessors import resolve_accessor
 from field_data import FieldData
+from form_value_model import FormValueModel
+from widget_pool import WidgetPool
+from field_geometry import FieldGeometryTable
+from spatial_index import UniformGridIndex
+from perf_counters import PerfCounters
+from profiler import profiler
+from shared_cache import SharedLeases, file_key, shared_templates
+
+
+class _EditorFocusWatcher(QObject):
+    """Отслеживает потерю фокуса редактором, созданным по требованию"""
+
+    def __init__(self, field_id: str, on_focus_out) -> None:
+        super().__init__()
+        self.field_id = field_id
+        self.on_focus_out = on_focus_out
+
+    def eventFilter(self, watched, event) -> bool:
+        if event.type() == QEvent.FocusOut:
+            # Открытие выпадающего списка и переключение окон не завершают редактирование
+            if event.reason() not in (Qt.PopupFocusReason, Qt.ActiveWindowFocusReason):
+                self.on_focus_out(self.field_id)
+        return False
 
 
 class FieldManager:
@@ -9,22 +35,324 @@ class FieldManager:
         self.parent_widget: QWidget = parent_widget
         self.fields: dict = {}
         self.field_data: dict = {}
+        # Значения всех полей; виджеты только привязываются к модели
+        self.model = FormValueModel()
+        # Аксессоры значений созданных виджетов, определяются один раз при создании
+        self.accessors: dict = {}
         self.widget_factory = DefaultWidgetFactory()
+        # Освобожденные виджеты переиспользуются следующей формой
+        self.widget_pool = WidgetPool()
+        self.widget_factory.widget_pool = self.widget_pool
+        # Версия общей таблицы стилей фабрики, установленной родителю полей
+        self._style_sheet_version: int = 0
+        # Собственная таблица стилей родителя, к которой добавляются правила полей
+        self._host_style_sheet: str = ""
+        self._installed_style_sheet: str = ""
+        # При потоковой загрузке таблица устанавливается один раз после разбора всего шаблона
+        self._style_sheet_deferred: bool = False
+        self.template_cache = None
+        # Разобранный шаблон общий для всех экземпляров, загрузивших тот же файл
+        self._leases = SharedLeases()
+        self._template_key = None
+
+        # Столбцовая таблица геометрии для отсечения полей вне видимой области
+        self.geometry = FieldGeometryTable()
+        # Сетка для поиска полей по точке и прямоугольнику в координатах фона
+        self.spatial_index = UniformGridIndex()
+        self.visible_fields: set = set()
+        self.viewport_height: int = 0
+        self.background_offset_x: int = 0
+        self.offset_y: int = 0
+
+        # Режим прокрутки одним контейнером, в котором лежат все поля
+        self.container: QWidget = None
+        self._content_width: int = 0
+        self._content_height: int = 0
 
+        # Режим отрисовки без виджетов, редакторы создаются по требованию
+        self.lazy_mode: bool = False
+        self._focus_watchers: dict = {}
+
+        # Счетчики для отладочного оверлея (выключены, пока оверлей скрыт)
+        self.perf = PerfCounters()
+
+    @profiler.profiled("fields.load")
     def load_from_xml(self, xml_path: str) -> None:
-        from xml_field_reader import XMLFieldReader
-        reader = XMLFieldReader()
-        fields_data: list[FieldData] = reader.read_fields_from_xml(xml_path)
+        key = file_key(xml_path)
+        try:
+            fields_data = self._acquire_template(xml_path, key)
+        except Exception:
+            # Неполный шаблон загружается, как раньше, но в общий кэш не попадает
+            fields_data = self._read_template(xml_path)
+            key = None
+        self._set_template_key(key)
 
+        self._validate_fields(xml_path, fields_data)
+        self._prepare_styles(fields_data)
         for field_data in fields_data:
             self.create_field(field_data)
 
+    @profiler.profiled("fields.reload")
+    def reload_from_xml(self, xml_path: str):
+        """Перечитывает шаблон и применяет только отличия от текущих полей
+
+        Возвращает (добавлено, удалено, изменено) или None, если файл не изменился.
+        """
+        key = file_key(xml_path)
+        if key == self._template_key:
+            return None
+        try:
+            fields_data = self._acquire_template(xml_path, key)
+        except Exception as e:
+            # Файл может быть сохранен не полностью - текущие поля и их значения остаются
+            print(f"Ошибка при перечитывании шаблона {xml_path}: {e}")
+            return None
+        self._set_template_key(key)
+
+        # Проверяются и стилизуются только новые и измененные поля
+        current = self.field_data
+        touched = [field_data for field_data in fields_data if current.get(field_data.field_id) != field_data]
+        if touched:
+            self._validate_fields(xml_path, touched)
+            self._prepare_styles(touched)
+        elif list(current) == [field_data.field_id for field_data in fields_data]:
+            # Файл сохранен без изменений полей
+            return 0, 0, 0
+        return self.apply_template(fields_data)
+
+    def apply_template(self, fields_data) -> tuple[int, int, int]:
+        """Приводит поля к набору fields_data, сравнивая их по field_id
+
+        Значения сохраняются в модели; у полей с измененной только геометрией
+        виджет перемещается, при других изменениях - создается заново.
+        """
+        new_fields = {field_data.field_id: field_data for field_data in fields_data}
+        removed = [field_id for field_id in self.field_data if field_id not in new_fields]
+        for field_id in removed:
+            self.remove_field(field_id)
+
+        added = changed = 0
+        for field_id, field_data in new_fields.items():
+            old = self.field_data.get(field_id)
+            if old is None:
+                self.create_field(field_data)
+                added += 1
+            elif old != field_data:
+                self.update_field(field_data)
+                changed += 1
+
+        # Порядок полей (обход по Tab, get_all_values) следует новому шаблону
+        if list(self.field_data) != list(new_fields):
+            order = {field_id: self.field_data[field_id] for field_id in new_fields}
+            self.field_data.clear()
+            self.field_data.update(order)
+        return added, len(removed), changed
+
+    def _acquire_template(self, xml_path: str, key):
+        """Возвращает общий разобранный шаблон; ошибка разбора выбрасывается, а не кэшируется"""
+        return self._leases.acquire(shared_templates, key,
+                                    lambda: tuple(self._read_template(xml_path, strict=True)))
+
+    def _read_template(self, xml_path: str, strict: bool = False) -> list[FieldData]:
+        """Разбирает шаблон; strict - выбрасывать ошибку вместо возврата уже прочитанных полей"""
+        if self.template_cache is not None:
+            try:
+                return self.template_cache.load(xml_path)
+            except Exception as e:
+                if strict:
+                    raise
+                print(f"Ошибка при чтении XML: {e}")
+                return []
+
+        from xml_field_reader import XMLFieldReader
+        reader = XMLFieldReader()
+        if strict:
+            return list(reader.iter_fields_from_xml(xml_path))
+        return reader.read_fields_from_xml(xml_path)
+
+    def _set_template_key(self, key) -> None:
+        """Запоминает используемый общий шаблон, освобождая ссылку на предыдущий"""
+        if self._template_key is not None and self._template_key != key:
+            self._leases.release(shared_templates, self._template_key)
+        self._template_key = key
+
+    def release_shared_resources(self) -> None:
+        """Освобождает ссылки на общие шаблоны (при удалении владельца)"""
+        self._template_key = None
+        self._leases.release_all()
+
+    def _validate_fields(self, xml_path: str, fields_data: list) -> None:
+        """Проверяет весь шаблон до создания виджетов, сообщая обо всех ошибках сразу"""
+        validate = getattr(self.widget_factory, "validate_fields", None)
+        if validate is None:
+            return
+        for field_id, error in validate(fields_data).items():
+            print(f"Ошибка в шаблоне {xml_path}, поле {field_id}: {error}")
+
+    def iter_xml_fields(self, xml_path: str):
+        """Возвращает итератор FieldData для пошаговой загрузки"""
+        key = file_key(xml_path)
+        fields_data = self._leases.acquire_existing(shared_templates, key)
+        if fields_data is not None:
+            # Шаблон уже разобран другим экземпляром - его можно проверить до создания полей
+            self._set_template_key(key)
+            self._validate_fields(xml_path, fields_data)
+            self._prepare_styles(fields_data)
+            return iter(fields_data)
+
+        if self.template_cache is not None:
+            fields = self.template_cache.iter_fields(xml_path)
+        else:
+            from xml_field_reader import XMLFieldReader
+            fields = XMLFieldReader().iter_fields_from_xml(xml_path)
+        self._style_sheet_deferred = True
+        return self._share_when_complete(xml_path, key, fields)
+
+    def _share_when_complete(self, xml_path: str, key, fields):
+        """Передает поля дальше и после полного чтения проверяет шаблон и кладет его в общий кэш"""
+        collected = []
+        try:
+            for field_data in fields:
+                collected.append(field_data)
+                yield field_data
+        except Exception:
+            # Разбор прерван ошибкой - уже созданные поля все равно получают общую таблицу стилей
+            self._prepare_styles(collected)
+            raise
+        self._leases.acquire(shared_templates, key, lambda: tuple(collected))
+        self._set_template_key(key)
+        # Полей, еще ожидающих создания в загрузчике, ошибки шаблона касаются так же
+        self._validate_fields(xml_path, collected)
+        self._prepare_styles(collected)
+
+    def set_template_cache(self, template_cache) -> None:
+        """Задает кэш скомпилированных шаблонов (None - разбирать XML каждый раз)"""
+        self.template_cache = template_cache
+
+    def set_lazy_mode(self, enabled: bool) -> None:
+        """Включает режим, в котором поля рисуются, а редакторы создаются по требованию"""
+        self.lazy_mode = enabled
+
+    def set_container_mode(self, enabled: bool) -> None:
+        """Включает прокрутку полей перемещением одного контейнера вместо каждого виджета"""
+        if enabled == (self.container is not None):
+            return
+
+        if enabled:
+            self.container = QWidget(self.parent_widget)
+            # Контейнер прозрачен и лежит под скроллбаром
+            self.container.lower()
+            self.container.show()
+            for field_id, widget in self.fields.items():
+                widget.setParent(self.container)
+                self._place_widget(widget, self.field_data[field_id])
+                widget.show()
+            self._update_container_size()
+        else:
+            for widget in self.fields.values():
+                widget.setParent(self.parent_widget)
+                widget.hide()
+            self.container.deleteLater()
+            self.container = None
+            self.visible_fields = set()
+            self.geometry.invalidate_all()
+
+        self.update_positions(self.background_offset_x, self.offset_y)
+
+    def _update_container_size(self) -> None:
+        if self.container is not None:
+            self.container.resize(self._content_width, self._content_height)
+
     def create_field(self, field_data: FieldData) -> None:
         """Создает поле на основе FieldData"""
+        self.field_data[field_data.field_id] = field_data
+        self.geometry.add(field_data.field_id, field_data.x, field_data.y, field_data.width, field_data.height)
+        self.spatial_index.add(field_data.field_id, field_data.x, field_data.y, field_data.width, field_data.height)
+
+        # Размер содержимого для режима контейнера
+        right = field_data.x + field_data.width
+        bottom = field_data.y + field_data.height
+        if right > self._content_width or bottom > self._content_height:
+            self._content_width = max(self._content_width, right)
+            self._content_height = max(self._content_height, bottom)
+            self._update_container_size()
+
+        # Кастомные виджеты нарисовать невозможно, поэтому они всегда создаются сразу
+        if self.lazy_mode and field_data.widget_type != "custom":
+            self.model.reset_value(field_data.field_id, self._initial_value(field_data))
+            return None
+
+        return self._create_widget(field_data)
+
+    def remove_field(self, field_id: str) -> None:
+        """Удаляет поле вместе с его значением и виджетом"""
+        if field_id not in self.field_data:
+            return
+        self._drop_widget(field_id)
+        self.model.remove(field_id)
+        del self.field_data[field_id]
+        self.geometry.remove(field_id)
+        self.spatial_index.remove(field_id)
+        self.visible_fields.discard(field_id)
+
+    def update_field(self, field_data: FieldData) -> None:
+        """Заменяет описание существующего поля, сохраняя его значение"""
+        field_id = field_data.field_id
+        old = self.field_data[field_id]
+        self.field_data[field_id] = field_data
+        self.geometry.update(field_id, field_data.x, field_data.y, field_data.width, field_data.height)
+        self.spatial_index.add(field_id, field_data.x, field_data.y, field_data.width, field_data.height)
+        self._content_width = max(self._content_width, field_data.x + field_data.width)
+        self._content_height = max(self._content_height, field_data.y + field_data.height)
+        self._update_container_size()
+
+        widget = self.fields.get(field_id)
+        geometry_only = replace(old, x=field_data.x, y=field_data.y,
+                                width=field_data.width, height=field_data.height) == field_data
+        if widget is not None and geometry_only:
+            widget.original_x = field_data.x
+            widget.original_y = field_data.y
+            widget.setMinimumSize(field_data.width, field_data.height)
+            if self.container is not None:
+                self._place_widget(widget, field_data)
+            # Вне контейнера новая геометрия применится при обновлении позиций
+            return
+
+        if field_data.widget_type != old.widget_type:
+            # Значение другого типа поля не подходит новому редактору
+            self.model.remove(field_id)
+            self.model.reset_value(field_id, self._initial_value(field_data))
+        if widget is None:
+            # Нарисованное поле перерисуется по новому описанию
+            return
+
+        self._drop_widget(field_id)
+        self.visible_fields.discard(field_id)
+        self.geometry.invalidate(field_id)
+        if not (self.lazy_mode and field_data.widget_type != "custom"):
+            self._create_widget(field_data)
+
+    def _drop_widget(self, field_id: str) -> None:
+        """Отвязывает и освобождает виджет поля, оставляя значение в модели"""
+        widget = self.fields.pop(field_id, None)
+        if widget is None:
+            return
+        watcher = self._focus_watchers.pop(field_id, None)
+        if watcher is not None:
+            widget.removeEventFilter(watcher)
+        self.model.unbind(field_id)
+        self.accessors.pop(field_id, None)
+        widget.hide()
+        self._dispose_widget(widget)
+
+    def _create_widget(self, field_data: FieldData) -> QWidget:
         widget = self.widget_factory.create_widget(field_data)
+        if not self._style_sheet_deferred:
+            # Варианты шаблона уже в таблице; новый появляется только у полей, созданных позже
+            self._sync_style_sheet()
 
         # Устанавливаем родительский виджет
-        widget.setParent(self.parent_widget)
+        widget.setParent(self.container if self.container is not None else self.parent_widget)
 
         # Сохраняем оригинальные координаты
         widget.original_x = field_data.x
@@ -34,58 +362,260 @@ class FieldManager:
         # Устанавливаем размер
         widget.setMinimumSize(field_data.width, field_data.height)
 
-        # Сохраняем в словари
+        # Редактор получает значение из модели (если оно уже есть) и сообщает ей о правках
+        accessor = resolve_accessor(widget)
+        self.accessors[field_data.field_id] = accessor
+        if accessor is not None:
+            self.model.bind(field_data.field_id, widget, accessor)
+
+        if self.container is not None:
+            # В контейнере поле размещается один раз в координатах фона
+            self._place_widget(widget, field_data)
+            widget.show()
+        else:
+            # Поле показывается только при попадании в видимую область
+            widget.hide()
+
         self.fields[field_data.field_id] = widget
-        self.field_data[field_data.field_id] = field_data
+        return widget
+
+    def _prepare_styles(self, fields_data) -> None:
+        """Собирает стили всех полей шаблона и устанавливает таблицу один раз до создания виджетов"""
+        prepare = getattr(self.widget_factory, "prepare_styles", None)
+        if prepare is not None:
+            prepare(fields_data)
+        self._style_sheet_deferred = False
+        self._sync_style_sheet()
+
+    def _sync_style_sheet(self) -> None:
+        """Устанавливает родителю общую таблицу стилей, если фабрика добавила в нее варианты"""
+        version = self.widget_factory.style_sheet_version
+        if version == self._style_sheet_version:
+            return
+        self._style_sheet_version = version
+
+        current = self.parent_widget.styleSheet()
+        if current != self._installed_style_sheet:
+            # Таблицу родителя задал его владелец - правила полей добавляются к ней
+            self._host_style_sheet = current
+        style_sheet = self.widget_factory.style_sheet()
+        if self._host_style_sheet:
+            style_sheet = self._host_style_sheet + "\n" + style_sheet
+        self._installed_style_sheet = style_sheet
+        self.parent_widget.setStyleSheet(style_sheet)
 
+    def _place_widget(self, widget: QWidget, field_data: FieldData) -> None:
+        if self.perf.enabled:
+            self.perf.increment("set_geometry")
+        if self.container is not None:
+            widget.setGeometry(field_data.x, field_data.y, field_data.width, field_data.height)
+        else:
+            widget.setGeometry(self.background_offset_x + field_data.x, field_data.y - self.offset_y,
+                               field_data.width, field_data.height)
+
+    def _initial_value(self, field_data: FieldData):
+        """Значение, которое получил бы виджет, созданный фабрикой"""
+        if field_data.widget_type == "checkbox":
+            return False
+        if field_data.widget_type == "combo_box":
+            if field_data.default_text in field_data.options:
+                return field_data.default_text
+            return field_data.options[0] if field_data.options else ""
+        return field_data.default_text
+
+    def is_painted(self, field_id: str) -> bool:
+        """Проверяет, рисуется ли поле без виджета"""
+        return field_id in self.field_data and field_id not in self.fields
+
+    def has_painted_fields(self) -> bool:
+        return len(self.fields) < len(self.field_data)
+
+    def materialize(self, field_id: str):
+        """Создает редактор для нарисованного поля"""
+        if not self.is_painted(field_id):
+            return self.fields.get(field_id)
+
+        field_data = self.field_data[field_id]
+        widget = self._create_widget(field_data)
+
+        watcher = _EditorFocusWatcher(field_id, self.release)
+        widget.installEventFilter(watcher)
+        self._focus_watchers[field_id] = watcher
+
+        self._place_widget(widget, field_data)
+        widget.show()
+        self.visible_fields.add(field_id)
         return widget
 
+    def release(self, field_id: str) -> None:
+        """Удаляет редактор, созданный по требованию, сохраняя его значение"""
+        watcher = self._focus_watchers.pop(field_id, None)
+        widget = self.fields.pop(field_id, None)
+        if watcher is None or widget is None:
+            return
+
+        # Значение уже хранится в модели, редактор только отвязывается
+        self.model.unbind(field_id)
+        self.accessors.pop(field_id, None)
+        widget.removeEventFilter(watcher)
+        widget.hide()
+        self.parent_widget.update(QRect(widget.mapTo(self.parent_widget, QPoint(0, 0)), widget.size()))
+        self._dispose_widget(widget)
+
+    def _dispose_widget(self, widget: QWidget) -> None:
+        """Возвращает виджет в пул или удаляет его"""
+        if self.container is not None and widget.parentWidget() is self.container:
+            # Контейнер может быть удален вместе с виджетами пула
+            widget.setParent(self.parent_widget)
+        if not self.widget_pool.release(widget):
+            widget.deleteLater()
+
+    def field_at(self, x: int, y: int):
+        """Возвращает id поля в точке с координатами фона"""
+        return self.spatial_index.field_at(x, y)
+
+    def fields_in_rect(self, rect: QRect) -> list:
+        """Возвращает id полей, пересекающих прямоугольник в координатах фона"""
+        return self.spatial_index.fields_in_rect(rect.x(), rect.y(), rect.width(), rect.height())
+
+    def has_editor(self, field_id: str) -> bool:
+        """Проверяет, что у поля есть виджет, способный принять фокус"""
+        return field_id in self.fields and self.field_data[field_id].widget_type != "label"
+
+    def next_editable_field(self, field_id, forward: bool = True):
+        """Возвращает id следующего редактируемого поля в порядке обхода"""
+        order = [fid for fid, data in self.field_data.items() if data.widget_type != "label"]
+        if not order:
+            return None
+        if field_id not in order:
+            return order[0] if forward else order[-1]
+        index = order.index(field_id) + (1 if forward else -1)
+        return order[index % len(order)]
+
     def register_custom_widget(self, widget_type: str, creator_func):
         """Регистрирует кастомный виджет"""
         self.widget_factory.register_custom_widget(widget_type, creator_func)
 
+    def set_viewport_height(self, height: int) -> None:
+        self.viewport_height = height
+
+    @profiler.profiled("fields.layout")
     def update_positions(self, background_offset_x: int, offset_y: int) -> None:
-        """Обновляет позиции всех полей"""
-        for field_id, widget in self.fields.items():
-            field_data = self.field_data[field_id]
-            absolute_x = background_offset_x + field_data.x
-            absolute_y = field_data.y - offset_y
-            widget.setGeometry(absolute_x, absolute_y, field_data.width, field_data.height)
+        """Обновляет позиции полей, попадающих в видимую область"""
+        self.background_offset_x = background_offset_x
+        self.offset_y = offset_y
+
+        if self.perf.enabled:
+            started = self.perf.now()
+            self._update_positions(background_offset_x, offset_y)
+            self.perf.add_time("update_positions", started)
+        else:
+            self._update_positions(background_offset_x, offset_y)
+
+    def _update_positions(self, background_offset_x: int, offset_y: int) -> None:
+        if self.container is not None:
+            # Прокрутка - одно перемещение контейнера, видимость полей отсекает Qt
+            self.container.move(background_offset_x, -offset_y)
+            self.visible_fields = set(self.geometry.query(offset_y, offset_y + self.viewport_height))
+            return
+
+        visible = self.geometry.query(offset_y, offset_y + self.viewport_height)
+        visible_set = set(visible)
+
+        # Скрываем поля, покинувшие видимую область
+        for field_id in self.visible_fields - visible_set:
+            widget = self.fields.get(field_id)
+            if widget is None:
+                continue
+            if widget.hasFocus():
+                # Поле с фокусом не скрываем, чтобы не потерять ввод
+                visible.append(field_id)
+                visible_set.add(field_id)
+            else:
+                widget.hide()
+                self.geometry.invalidate(field_id)
+
+        # Геометрия применяется только к полям, чей прямоугольник изменился
+        changed = self.geometry.changed_rects(visible, background_offset_x, offset_y)
+        for field_id, x, y, width, height in changed:
+            widget = self.fields.get(field_id)
+            if widget is not None:
+                widget.setGeometry(x, y, width, height)
+        if changed and self.perf.enabled:
+            self.perf.increment("set_geometry", len(changed))
+
+        for field_id in visible_set - self.visible_fields:
+            widget = self.fields.get(field_id)
+            if widget is not None:
+                widget.show()
+
+        self.visible_fields = visible_set
 
     def get_value(self, field_id: str):
         """Возвращает значение поля"""
-        widget = self.fields.get(field_id)
-        if isinstance(widget, QLineEdit):
-            return widget.text()
-        elif isinstance(widget, QTextEdit):
-            return widget.toPlainText()
-        elif isinstance(widget, QLabel):
-            return widget.text()
-        elif isinstance(widget, QCheckBox):
-            return widget.isChecked()
-        elif isinstance(widget, QComboBox):
-            return widget.currentText()
-        return None
+        return self.model.value(field_id)
 
     def set_value(self, field_id: str, value) -> None:
         """Устанавливает значение поля"""
-        widget = self.fields.get(field_id)
-        if isinstance(widget, QLineEdit):
-            widget.setText(value)
-        elif isinstance(widget, QTextEdit):
-            widget.setPlainText(value)
-        elif isinstance(widget, QLabel):
-            widget.setText(value)
-        elif isinstance(widget, QCheckBox):
-            widget.setChecked(bool(value))
-        elif isinstance(widget, QComboBox):
-            index = widget.findText(value)
-            if index >= 0:
-                widget.setCurrentIndex(index)
+        if self._store_value(field_id, value) and field_id not in self.fields:
+            self.parent_widget.update()
+
+    def get_all_values(self) -> dict:
+        """Возвращает значения всех полей в порядке шаблона"""
+        value = self.model.value
+        return {field_id: value(field_id) for field_id in self.field_data}
+
+    def set_values(self, mapping: dict) -> None:
+        """Устанавливает значения нескольких полей с одной перерисовкой в конце
+
+        Модель записывает значения в редакторы с заблокированными сигналами.
+        """
+        parent = self.parent_widget
+        updates_enabled = parent.updatesEnabled()
+        parent.setUpdatesEnabled(False)
+        try:
+            for field_id, value in mapping.items():
+                self._store_value(field_id, value)
+        finally:
+            parent.setUpdatesEnabled(updates_enabled)
+        parent.update()
+
+    def _store_value(self, field_id: str, value) -> bool:
+        """Записывает значение в модель, возвращает True при изменении"""
+        if field_id in self.fields:
+            # Значение виджета без аксессора прочитать и записать нельзя
+            if self.accessors.get(field_id) is None:
+                return False
+        elif field_id in self.field_data:
+            # Нарисованное поле проверяется так же, как это сделал бы редактор
+            field_data = self.field_data[field_id]
+            if field_data.widget_type == "checkbox":
+                value = bool(value)
+            elif field_data.widget_type == "combo_box" and value not in field_data.options:
+                return False
+        else:
+            return False
+        return self.model.set_value(field_id, value)
 
     def clear(self) -> None:
         """Очищает все поля"""
+        for field_id, field in self.fields.items():
+            watcher = self._focus_watchers.get(field_id)
+            if watcher is not None:
+                field.removeEventFilter(watcher)
+        # Привязки к модели снимаются до сброса виджетов пулом
+        self.model.clear()
         for field in self.fields.values():
-            field.deleteLater()
+            self._dispose_widget(field)
         self.fields.clear()
-        self.field_data.clear()
\ No newline at end of file
+        self.field_data.clear()
+        self.accessors.clear()
+        self._focus_watchers.clear()
+        self.geometry.clear()
+        self.spatial_index.clear()
+        self.visible_fields.clear()
+        self._set_template_key(None)
+        self._style_sheet_deferred = False
+        self._content_width = 0
+        self._content_height = 0
+        self._update_container_size()
@@ -0,0 +1,145 @@
+# field_painter.py
+import re
+from PySide6.QtCore import Qt, QRect, QPoint
+from PySide6.QtGui import QPainter, QFont, QColor, QPen, QPolygon
+from field_data import FieldData
+
+
+class FieldPainter:
+    """Рисует значения полей напрямую через QPainter, без создания виджетов"""
+
+    ALIGNMENT_MAP = {
+        "left": Qt.AlignLeft,
+        "center": Qt.AlignCenter,
+        "right": Qt.AlignRight,
+        "top": Qt.AlignTop,
+        "bottom": Qt.AlignBottom
+    }
+
+    # Цвета, повторяющие стили DefaultWidgetFactory
+    INPUT_BACKGROUND = QColor(255, 255, 255, 77)
+    INPUT_BORDER = QColor("#cccccc")
+    TEXT_COLOR = QColor(0, 0, 0)
+
+    _RGB_PATTERN = re.compile(r"rgba?\(\s*([^)]*)\)")
+
+    def __init__(self) -> None:
+        self._fonts: dict = {}
+        self._colors: dict = {}
+
+    def paint_field(self, painter: QPainter, field_data: FieldData, x: int, y: int, value) -> None:
+        """Рисует поле в точке (x, y) с заданным значением"""
+        rect = QRect(x, y, field_data.width, field_data.height)
+        painter.setFont(self._get_font(field_data))
+
+        widget_type = field_data.widget_type
+        if widget_type in ("line_edit", "text_edit", "combo_box"):
+            self._paint_input(painter, field_data, rect, value)
+        elif widget_type == "checkbox":
+            self._paint_checkbox(painter, field_data, rect, value)
+        else:
+            self._paint_label(painter, field_data, rect, value)
+
+    def _paint_label(self, painter: QPainter, field_data: FieldData, rect: QRect, value) -> None:
+        if field_data.background_color:
+            painter.fillRect(rect, self._get_color(field_data.background_color))
+
+        alignment = self.ALIGNMENT_MAP.get(field_data.alignment, Qt.AlignLeft)
+        if not alignment & Qt.AlignVertical_Mask:
+            alignment |= Qt.AlignVCenter
+
+        painter.setPen(self._get_color(field_data.text_color) if field_data.text_color else self.TEXT_COLOR)
+        painter.drawText(rect, alignment | Qt.TextWordWrap, str(value or ""))
+
+    def _paint_input(self, painter: QPainter, field_data: FieldData, rect: QRect, value) -> None:
+        background = (self._get_color(field_data.background_color)
+                      if field_data.background_color else self.INPUT_BACKGROUND)
+
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(QPen(self.INPUT_BORDER, 1))
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect.adjusted(0, 0, -1, -1), 3, 3)
+        painter.setBrush(Qt.NoBrush)
+        painter.setRenderHint(QPainter.Antialiasing, False)
+
+        # Отступы как у padding: 2px 5px
+        text_rect = rect.adjusted(5, 2, -5, -2)
+        painter.setPen(self.TEXT_COLOR)
+        text = str(value or "")
+
+        if field_data.widget_type == "text_edit":
+            painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, text)
+            return
+
+        if field_data.widget_type == "combo_box":
+            # Стрелка выпадающего списка
+            arrow_x = rect.right() - 12
+            arrow_y = rect.center().y()
+            painter.setBrush(self.TEXT_COLOR)
+            painter.drawPolygon(QPolygon([
+                QPoint(arrow_x - 4, arrow_y - 2),
+                QPoint(arrow_x + 4, arrow_y - 2),
+                QPoint(arrow_x, arrow_y + 3)
+            ]))
+            painter.setBrush(Qt.NoBrush)
+            text_rect.setRight(arrow_x - 8)
+
+        elided = painter.fontMetrics().elidedText(text, Qt.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, elided)
+
+    def _paint_checkbox(self, painter: QPainter, field_data: FieldData, rect: QRect, value) -> None:
+        if field_data.background_color:
+            painter.fillRect(rect, self._get_color(field_data.background_color))
+
+        # Индикатор
+        box_size = 13
+        box = QRect(rect.x() + 2, rect.center().y() - box_size // 2, box_size, box_size)
+        painter.setPen(QPen(self.INPUT_BORDER.darker(150), 1))
+        painter.setBrush(QColor(255, 255, 255))
+        painter.drawRect(box)
+        painter.setBrush(Qt.NoBrush)
+
+        if value:
+            painter.setRenderHint(QPainter.Antialiasing, True)
+            painter.setPen(QPen(self.TEXT_COLOR, 2))
+            painter.drawLine(box.left() + 3, box.center().y(), box.left() + 5, box.bottom() - 3)
+            painter.drawLine(box.left() + 5, box.bottom() - 3, box.right() - 2, box.top() + 3)
+            painter.setRenderHint(QPainter.Antialiasing, False)
+
+        # Подпись чекбокса
+        text_rect = rect.adjusted(box_size + 6, 0, 0, 0)
+        painter.setPen(self._get_color(field_data.text_color) if field_data.text_color else self.TEXT_COLOR)
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignVCenter, field_data.default_text)
+
+    def _get_font(self, field_data: FieldData) -> QFont:
+        key = (field_data.font_size, field_data.bold)
+        font = self._fonts.get(key)
+        if font is None:
+            font = QFont()
+            font.setPointSize(field_data.font_size)
+            font.setBold(field_data.bold)
+            self._fonts[key] = font
+        return font
+
+    def _get_color(self, css_color: str) -> QColor:
+        """Преобразует CSS цвет (имя, #hex, rgb(), rgba()) в QColor"""
+        color = self._colors.get(css_color)
+        if color is not None:
+            return color
+
+        match = self._RGB_PATTERN.fullmatch(css_color.strip())
+        if match:
+            parts = [part.strip() for part in match.group(1).split(",")]
+            try:
+                r, g, b = (int(part) for part in parts[:3])
+                alpha = float(parts[3]) if len(parts) > 3 else 1.0
+                # Альфа в CSS задается либо долей, либо значением 0-255
+                a = int(alpha * 255) if alpha <= 1 else int(alpha)
+                color = QColor(r, g, b, a)
+            except ValueError:
+                color = QColor()
+        else:
+            color = QColor(css_color.strip())
+
+        self._colors[css_color] = color
+        return color
@@ -1,25 +1,92 @@
 # fields_renderer.py
+from PySide6.QtWidgets import QApplication, QCheckBox, QComboBox
 from PySide6.QtGui import QPainter
+from PySide6.QtCore import Qt, QPoint, QRect, Signal
+from field_loader import IncrementalFieldLoader
 from field_manager import FieldManager
+from field_painter import FieldPainter
 from renderer_interface import RendererInterface
+from template_cache import CompiledTemplateCache
 
 
 class FieldsRenderer(RendererInterface):
+    fields_load_progress = Signal(int)
+    fields_loaded = Signal(int)
+
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
         self.field_manager = FieldManager(parent)
+        self.destroyed.connect(self.field_manager.release_shared_resources)
+        self.field_painter = FieldPainter()
         self.background_offset_x: int = 0
         self.offset_y: int = 0
 
+        self.field_loader = IncrementalFieldLoader(self.field_manager, self)
+        self.field_loader.progress.connect(self._on_load_progress)
+        self.field_loader.finished.connect(self._on_load_finished)
+
     def load_fields(self, xml_path: str) -> None:
         self.field_manager.load_from_xml(xml_path)
         self._update_fields_positions()
 
+    def load_fields_incremental(self, xml_path: str) -> None:
+        """Загружает поля частями, не блокируя цикл событий"""
+        self._update_loader_viewport()
+        self.field_loader.start(self.field_manager.iter_xml_fields(xml_path))
+
+    def reload_fields(self, xml_path: str):
+        """Применяет изменения шаблона к текущим полям, сохраняя введенные значения"""
+        # Незавершенная пошаговая загрузка заменяется сравнением с новым шаблоном
+        self.field_loader.stop()
+        result = self.field_manager.reload_from_xml(xml_path)
+        if result is not None:
+            self._update_fields_positions()
+            self.parent.update()
+        return result
+
+    def set_frame_budget(self, budget_ms: float) -> None:
+        self.field_loader.frame_budget_ms = budget_ms
+
+    def _on_load_progress(self, created: int) -> None:
+        self._update_fields_positions()
+        self.parent.update()
+        self.fields_load_progress.emit(created)
+
+    def _on_load_finished(self, created: int) -> None:
+        self.fields_loaded.emit(created)
+
+    def _update_loader_viewport(self) -> None:
+        self.field_loader.set_viewport(self.offset_y, self.offset_y + self.field_manager.viewport_height)
+
+    def set_template_cache(self, enabled: bool, cache_dir: str = None) -> None:
+        self.field_manager.set_template_cache(CompiledTemplateCache(cache_dir) if enabled else None)
+
+    def set_container_mode(self, enabled: bool) -> None:
+        self.field_manager.set_container_mode(enabled)
+
+    def set_lazy_mode(self, enabled: bool) -> None:
+        self.field_manager.set_lazy_mode(enabled)
+
+    def clear_fields(self) -> None:
+        """Удаляет поля текущей формы, возвращая их виджеты в пул"""
+        self.field_loader.stop()
+        self.field_manager.clear()
+
+    def set_perf_counters(self, perf) -> None:
+        self.field_manager.perf = perf
+
+    def field_counts(self) -> tuple[int, int, int]:
+        """Возвращает количество (созданных виджетов, видимых полей, всех полей)"""
+        manager = self.field_manager
+        return len(manager.fields), len(manager.visible_fields), len(manager.field_data)
+
     def set_background_offset(self, offset_x: int, offset_y: int) -> None:
         self.background_offset_x = offset_x
         self.offset_y = offset_y
         self._update_fields_positions()
+        if self.field_loader.is_running():
+            self._update_loader_viewport()
 
     def _update_fields_positions(self) -> None:
         self.field_manager.update_positions(self.background_offset_x, self.offset_y)
@@ -30,17 +97,87 @@ class FieldsRenderer(RendererInterface):
     def set_field_value(self, field_id: str, value: str) -> None:
         self.field_manager.set_value(field_id, value)
 
+    def get_all_values(self) -> dict:
+        return self.field_manager.get_all_values()
+
+    def set_values(self, mapping: dict) -> None:
+        self.field_manager.set_values(mapping)
+
     def register_custom_widget(self, widget_type: str, creator_func):
         self.field_manager.register_custom_widget(widget_type, creator_func)
 
     def clear_focus_from_fields(self) -> None:
         self.parent.setFocus()
-        for widget in self.field_manager.fields.values():
+        # Потеря фокуса может освободить редактор, поэтому обходим копию
+        for widget in list(self.field_manager.fields.values()):
             widget.clearFocus()
 
-    def render(self, painter: QPainter) -> None:
-        # Поля ввода рисуются автоматически как виджеты
-        pass
+    def field_at(self, pos: QPoint):
+        """Возвращает id поля под точкой в координатах виджета"""
+        return self.field_manager.field_at(pos.x() - self.background_offset_x, pos.y() + self.offset_y)
+
+    def fields_in_rect(self, rect: QRect) -> list:
+        """Возвращает id полей, пересекающих прямоугольник в координатах виджета"""
+        return self.field_manager.fields_in_rect(rect.translated(-self.background_offset_x, self.offset_y))
+
+    def field_rect(self, field_id: str) -> QRect:
+        """Прямоугольник поля в координатах виджета"""
+        field_data = self.field_manager.field_data[field_id]
+        return QRect(self.background_offset_x + field_data.x, field_data.y - self.offset_y,
+                     field_data.width, field_data.height)
+
+    def has_editor(self, field_id) -> bool:
+        return field_id is not None and self.field_manager.has_editor(field_id)
+
+    def activate_field_at(self, pos: QPoint) -> bool:
+        """Создает редактор для нарисованного поля под курсором"""
+        field_id = self.field_at(pos)
+        if field_id is None or not self.field_manager.is_painted(field_id):
+            return False
+        if self.field_manager.field_data[field_id].widget_type == "label":
+            return False
+
+        widget = self.field_manager.materialize(field_id)
+        widget.setFocus(Qt.MouseFocusReason)
+        if isinstance(widget, QCheckBox):
+            widget.toggle()
+        elif isinstance(widget, QComboBox):
+            widget.showPopup()
+        return True
+
+    def focus_next_field(self, forward: bool):
+        """Переводит фокус на следующее поле, возвращает его FieldData"""
+        if not self.field_manager.lazy_mode:
+            return None
+
+        focus_widget = QApplication.focusWidget()
+        current_id = getattr(focus_widget, "field_id", None)
+        field_id = self.field_manager.next_editable_field(current_id, forward)
+        if field_id is None:
+            return None
+
+        widget = self.field_manager.materialize(field_id)
+        widget.setFocus(Qt.TabFocusReason if forward else Qt.BacktabFocusReason)
+        return self.field_manager.field_data[field_id]
+
+    def render(self, painter: QPainter, rect: QRect = None) -> None:
+        # Виджеты полей рисуются автоматически, здесь рисуются только поля без виджетов
+        if not self.field_manager.has_painted_fields():
+            return
+
+        # Рисовальщик полей меняет шрифт и перо - следующие рендереры получают исходное состояние
+        painter.save()
+        for field_id in self.field_manager.visible_fields:
+            if not self.field_manager.is_painted(field_id):
+                continue
+            field_data = self.field_manager.field_data[field_id]
+            x = self.background_offset_x + field_data.x
+            y = field_data.y - self.offset_y
+            if rect is not None and not rect.intersects(QRect(x, y, field_data.width, field_data.height)):
+                continue
+            self.field_painter.paint_field(painter, field_data, x, y, self.field_manager.model.value(field_id))
+        painter.restore()
 
     def handle_resize(self, width: int, height: int) -> None:
-        self._update_fields_positions()
\ No newline at end of file
+        self.field_manager.set_viewport_height(height)
+        self._update_fields_positions()
@@ -0,0 +1,155 @@
+# form_value_model.py
+from PySide6.QtCore import QObject, Signal
+
+
+class FormValueModel(QObject):
+    """Значения полей формы, не зависящие от виджетов
+
+    Модель хранит значения по field_id, ведет счетчик версий и множество
+    измененных полей. Редакторы привязываются к модели в обе стороны: значение
+    модели записывается в виджет при привязке, а правки пользователя попадают
+    в модель через сигнал изменения виджета. Поэтому виджеты можно удалять и
+    создавать заново без потери данных.
+    """
+    # field_id, новое значение
+    value_changed = Signal(str, object)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._values: dict = {}
+        # Версия последнего изменения каждого поля
+        self._versions: dict = {}
+        self.version: int = 0
+        self._dirty: set = set()
+        # field_id -> (виджет, аксессор, сигнал, слот)
+        self._bindings: dict = {}
+
+    def __contains__(self, field_id) -> bool:
+        return field_id in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def value(self, field_id: str, default=None):
+        return self._values.get(field_id, default)
+
+    def values(self) -> dict:
+        return dict(self._values)
+
+    def reset_value(self, field_id: str, value) -> None:
+        """Задает исходное значение поля, не отмечая его измененным"""
+        self._values[field_id] = self._push(field_id, value)
+        self._versions.pop(field_id, None)
+        self._dirty.discard(field_id)
+
+    def set_value(self, field_id: str, value) -> bool:
+        """Изменяет значение поля, возвращает True, если оно действительно изменилось"""
+        if field_id in self._values and self._values[field_id] == value:
+            return False
+
+        # Редактор может отклонить значение (например, отсутствующий вариант списка)
+        return self._store(field_id, self._push(field_id, value))
+
+    def _store(self, field_id: str, value) -> bool:
+        if field_id in self._values and self._values[field_id] == value:
+            return False
+
+        self._values[field_id] = value
+        self.version += 1
+        self._versions[field_id] = self.version
+        self._dirty.add(field_id)
+        self.value_changed.emit(field_id, value)
+        return True
+
+    def changed_since(self, version: int) -> dict:
+        """Возвращает значения полей, измененных после версии version"""
+        return {field_id: self._values[field_id]
+                for field_id, field_version in self._versions.items() if field_version > version}
+
+    def dirty_fields(self) -> set:
+        return set(self._dirty)
+
+    def is_dirty(self, field_id: str) -> bool:
+        return field_id in self._dirty
+
+    def mark_clean(self, field_ids=None) -> None:
+        """Снимает отметку об изменении (например, после сохранения)"""
+        if field_ids is None:
+            self._dirty.clear()
+        else:
+            self._dirty.difference_update(field_ids)
+
+    def remove(self, field_id: str) -> None:
+        self.unbind(field_id)
+        self._values.pop(field_id, None)
+        self._versions.pop(field_id, None)
+        self._dirty.discard(field_id)
+
+    def clear(self) -> None:
+        for field_id in list(self._bindings):
+            self.unbind(field_id)
+        self._values.clear()
+        self._versions.clear()
+        self._dirty.clear()
+
+    def bind(self, field_id: str, widget, accessor) -> None:
+        """Привязывает редактор к полю: значение модели записывается в виджет, правки - в модель"""
+        self.unbind(field_id)
+
+        signal = getattr(widget, accessor.signal) if accessor.signal else None
+        if signal is not None:
+            slot = self._make_slot(field_id)
+            signal.connect(slot)
+        else:
+            slot = None
+        self._bindings[field_id] = (widget, accessor, signal, slot)
+
+        if field_id in self._values:
+            self._values[field_id] = self._push(field_id, self._values[field_id])
+        else:
+            self._values[field_id] = accessor.getter(widget)
+
+    def _make_slot(self, field_id: str):
+        # Сигналы редакторов передают разные аргументы - значение читается аксессором
+        def slot(*args):
+            self._on_editor_changed(field_id)
+        return slot
+
+    def unbind(self, field_id: str) -> None:
+        binding = self._bindings.pop(field_id, None)
+        if binding is None:
+            return
+        widget, accessor, signal, slot = binding
+        if signal is not None:
+            try:
+                signal.disconnect(slot)
+            except (RuntimeError, TypeError):
+                # Виджет уже удален на стороне Qt
+                pass
+
+    def bound_widget(self, field_id: str):
+        binding = self._bindings.get(field_id)
+        return binding[0] if binding is not None else None
+
+    def _push(self, field_id: str, value):
+        """Записывает значение в привязанный редактор, не вызывая обратного обновления модели
+
+        Возвращает значение, которое принял редактор.
+        """
+        binding = self._bindings.get(field_id)
+        if binding is None:
+            return value
+        widget, accessor = binding[0], binding[1]
+        blocked = widget.blockSignals(True)
+        try:
+            accessor.setter(widget, value)
+        finally:
+            widget.blockSignals(blocked)
+        return accessor.getter(widget)
+
+    def _on_editor_changed(self, field_id: str) -> None:
+        binding = self._bindings.get(field_id)
+        if binding is not None:
+            # Значение пришло из редактора - записывать его обратно не нужно
+            widget, accessor = binding[0], binding[1]
+            self._store(field_id, accessor.getter(widget))
@@ -0,0 +1,87 @@
+# perf_counters.py
+from collections import deque
+from time import perf_counter
+
+
+class PerfCounters:
+    """Скользящие счетчики производительности для отладочного оверлея
+
+    Пока счетчики выключены, вызывающий код проверяет только флаг enabled,
+    поэтому измерения почти ничего не стоят. Времена хранятся в миллисекундах
+    за последние window кадров.
+    """
+
+    def __init__(self, window: int = 120) -> None:
+        self.enabled: bool = False
+        self.window: int = window
+        self._samples: dict = {}
+        # Счетчики текущего кадра, переносятся в скользящие окна в end_frame
+        self._frame_counts: dict = {}
+        self._frame_times: dict = {}
+        self._frame_names: set = set()
+        self._last_frame: float = 0.0
+
+    def set_enabled(self, enabled: bool) -> None:
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._frame_counts.clear()
+        self._frame_times.clear()
+        self._frame_names.clear()
+        self._last_frame = 0.0
+
+    @staticmethod
+    def now() -> float:
+        return perf_counter()
+
+    def add_time(self, name: str, started: float) -> None:
+        """Добавляет к счетчику name время, прошедшее с момента started"""
+        self._frame_times[name] = self._frame_times.get(name, 0.0) + (perf_counter() - started) * 1000
+
+    def increment(self, name: str, count: int = 1) -> None:
+        self._frame_counts[name] = self._frame_counts.get(name, 0) + count
+
+    def _sample(self, name: str, value: float) -> None:
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(value)
+
+    def end_frame(self, started: float) -> None:
+        """Завершает кадр, начатый в момент started, и переносит счетчики кадра в окна"""
+        now = perf_counter()
+        self._sample("frame", (now - started) * 1000)
+        if self._last_frame:
+            self._sample("interval", (now - self._last_frame) * 1000)
+        self._last_frame = now
+
+        for name, value in self._frame_times.items():
+            self._sample(name, value)
+        for name, value in self._frame_counts.items():
+            self._sample(name, value)
+
+        # Счетчики, не менявшиеся за кадр, получают нулевой отсчет
+        touched = self._frame_times.keys() | self._frame_counts.keys()
+        for name in self._frame_names - touched:
+            self._sample(name, 0)
+        self._frame_names |= touched
+
+        self._frame_times.clear()
+        self._frame_counts.clear()
+
+    def average(self, name: str) -> float:
+        samples = self._samples.get(name)
+        if not samples:
+            return 0.0
+        return sum(samples) / len(samples)
+
+    def maximum(self, name: str) -> float:
+        samples = self._samples.get(name)
+        return max(samples) if samples else 0.0
+
+    def fps(self) -> float:
+        interval = self.average("interval")
+        return 1000 / interval if interval else 0.0
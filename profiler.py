@@ -0,0 +1,160 @@
+# profiler.py
+import json
+import os
+import threading
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter_ns
+
+
+class Profiler:
+    """Сбор времени выполнения фаз отрисовки, загрузки и компоновки за сессию
+
+    Для каждой фазы ведется гистограмма с корзинами по степеням двойки
+    (в микросекундах), а отдельные замеры сохраняются для экспорта в формате
+    Chrome trace (chrome://tracing, Perfetto). Пока профилирование выключено,
+    обертки проверяют только флаг enabled.
+    """
+
+    def __init__(self, max_events: int = 200000) -> None:
+        self.enabled: bool = False
+        # Ограничение числа сохраняемых замеров, гистограммы ведутся всегда
+        self.max_events: int = max_events
+        self._lock = threading.Lock()
+        self._session_start: int = 0
+        self._phases: dict = {}
+        self._events: list = []
+        self._dropped_events: int = 0
+
+    def start_session(self) -> None:
+        """Сбрасывает накопленные данные и включает профилирование"""
+        with self._lock:
+            self._phases.clear()
+            self._events.clear()
+            self._dropped_events = 0
+            self._session_start = perf_counter_ns()
+        self.enabled = True
+
+    def stop_session(self) -> None:
+        self.enabled = False
+
+    def record(self, name: str, started_ns: int, duration_ns: int) -> None:
+        """Добавляет замер фазы name"""
+        duration_us = duration_ns // 1000
+        bucket = duration_us.bit_length()
+        with self._lock:
+            stats = self._phases.get(name)
+            if stats is None:
+                stats = self._phases[name] = {"count": 0, "total_ns": 0, "min_ns": duration_ns,
+                                              "max_ns": duration_ns, "buckets": {}}
+            stats["count"] += 1
+            stats["total_ns"] += duration_ns
+            stats["min_ns"] = min(stats["min_ns"], duration_ns)
+            stats["max_ns"] = max(stats["max_ns"], duration_ns)
+            stats["buckets"][bucket] = stats["buckets"].get(bucket, 0) + 1
+
+            if len(self._events) < self.max_events:
+                self._events.append((name, started_ns, duration_ns, threading.get_ident()))
+            else:
+                self._dropped_events += 1
+
+    @contextmanager
+    def phase(self, name: str):
+        """Замеряет время выполнения блока with как фазу name"""
+        if not self.enabled:
+            yield
+            return
+        started = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, started, perf_counter_ns() - started)
+
+    def wrap(self, name: str, func):
+        """Возвращает функцию, замеряющую каждый вызов func как фазу name"""
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            started = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, started, perf_counter_ns() - started)
+        return profiled
+
+    def profiled(self, name: str):
+        """Декоратор, замеряющий вызовы функции как фазу name"""
+        def decorator(func):
+            return self.wrap(name, func)
+        return decorator
+
+    def summary(self) -> dict:
+        """Статистика по фазам: количество, время в мс, перцентили и гистограмма"""
+        with self._lock:
+            phases = {name: dict(stats, buckets=dict(stats["buckets"])) for name, stats in self._phases.items()}
+
+        result = {}
+        for name, stats in sorted(phases.items()):
+            count = stats["count"]
+            result[name] = {
+                "count": count,
+                "total_ms": stats["total_ns"] / 1e6,
+                "mean_ms": stats["total_ns"] / count / 1e6,
+                "min_ms": stats["min_ns"] / 1e6,
+                "max_ms": stats["max_ns"] / 1e6,
+                "p50_ms": self._percentile(stats["buckets"], count, 0.5),
+                "p95_ms": self._percentile(stats["buckets"], count, 0.95),
+                "p99_ms": self._percentile(stats["buckets"], count, 0.99),
+                # Корзина b содержит замеры короче 2**b мкс
+                "histogram_us": {str(1 << bucket): stats["buckets"][bucket]
+                                 for bucket in sorted(stats["buckets"])},
+            }
+        return result
+
+    def _percentile(self, buckets: dict, count: int, fraction: float) -> float:
+        """Верхняя граница корзины, в которую попадает перцентиль, в мс"""
+        threshold = count * fraction
+        seen = 0
+        for bucket in sorted(buckets):
+            seen += buckets[bucket]
+            if seen >= threshold:
+                return (1 << bucket) / 1000
+        return 0.0
+
+    def export_json(self, path: str) -> None:
+        """Сохраняет статистику сессии в JSON"""
+        data = {
+            "session_ms": (perf_counter_ns() - self._session_start) / 1e6 if self._session_start else 0.0,
+            "dropped_events": self._dropped_events,
+            "phases": self.summary(),
+        }
+        self._write(path, data)
+
+    def export_chrome_trace(self, path: str) -> None:
+        """Сохраняет замеры сессии в формате Chrome trace"""
+        with self._lock:
+            events = list(self._events)
+
+        pid = os.getpid()
+        trace_events = [{
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (started - self._session_start) / 1000,
+            "dur": duration / 1000,
+            "pid": pid,
+            "tid": thread_id,
+        } for name, started, duration, thread_id in events]
+        self._write(path, {"traceEvents": trace_events, "displayTimeUnit": "ms"})
+
+    def _write(self, path: str, data: dict) -> None:
+        try:
+            with open(path, "w", encoding="utf-8") as output_file:
+                json.dump(data, output_file, ensure_ascii=False, indent=1)
+        except OSError as e:
+            print(f"Ошибка при сохранении профиля {path}: {e}")
+
+
+# Общий профайлер процесса
+profiler = Profiler()
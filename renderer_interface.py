@@ -1,11 +1,20 @@
 # renderer_interface.py
 from abc import ABC, abstractmethod, ABCMeta
-from PySide6.QtGui import QPainter
-from PySide6.QtCore import QObject
+from PySide6.QtGui import QPainter, QRegion
+from PySide6.QtCore import QObject, QRect
+from profiler import profiler
 
 
 class QObjectABCMeta(type(QObject), ABCMeta):
-    pass
+    # Методы рендереров, вызовы которых замеряются профайлером
+    PROFILED_METHODS = ("render", "handle_resize")
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        for method_name in mcs.PROFILED_METHODS:
+            method = namespace.get(method_name)
+            if callable(method) and not getattr(method, "__isabstractmethod__", False):
+                namespace[method_name] = profiler.wrap(f"{name}.{method_name}", method)
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
 
 class RendererInterface(QObject, ABC, metaclass=QObjectABCMeta):
     """Интерфейс для всех рендереров"""
@@ -14,11 +23,15 @@ class RendererInterface(QObject, ABC, metaclass=QObjectABCMeta):
         super().__init__(parent)
 
     @abstractmethod
-    def render(self, painter: QPainter) -> None:
-        """Основной метод отрисовки"""
+    def render(self, painter: QPainter, rect: QRect = None) -> None:
+        """Основной метод отрисовки (rect - перерисовываемая область, None - весь виджет)"""
         pass
 
     @abstractmethod
     def handle_resize(self, width: int, height: int) -> None:
         """Обработка изменения размера"""
         pass
+
+    def take_dirty_region(self) -> QRegion:
+        """Возвращает и сбрасывает область, требующую перерисовки"""
+        return QRegion()
@@ -0,0 +1,153 @@
+# scroll_scheduler.py
+import math
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer, Qt, Signal
+
+
+class ScrollScheduler(QObject):
+    """Объединяет запросы прокрутки и применяет смещение не чаще одного раза за кадр
+
+    Поддерживает мгновенную прокрутку, плавную анимацию к цели и кинетическую
+    прокрутку с затуханием. Все режимы работают от одного таймера кадров.
+    """
+    frame_offset = Signal(int)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.current_offset: int = 0
+        self.max_offset: int = 0
+
+        # Длительность плавной анимации, мс
+        self.animation_duration_ms: int = 120
+        # Коэффициент затухания кинетической прокрутки, 1/с
+        self.friction: float = 4.0
+        # Скорость, ниже которой кинетическая прокрутка останавливается, пикс/с
+        self.min_velocity: float = 30.0
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(16)
+        self._timer.timeout.connect(self._on_frame)
+        self._clock = QElapsedTimer()
+        self._clock.start()
+
+        self._target: int = 0
+        self._pending: bool = False
+
+        self._animating: bool = False
+        self._animation_from: float = 0.0
+        self._animation_start_ms: int = 0
+
+        self._velocity: float = 0.0
+        self._fling_position: float = 0.0
+        self._last_frame_ms: int = 0
+
+    def set_frame_rate(self, fps: float) -> None:
+        """Задает частоту кадров (обычно частоту обновления экрана)"""
+        if fps > 0:
+            self._timer.setInterval(max(1, round(1000 / fps)))
+
+    def set_range(self, max_offset: int) -> None:
+        self.max_offset = max(0, max_offset)
+
+    def _clamp(self, offset: float) -> int:
+        return int(max(0, min(round(offset), self.max_offset)))
+
+    def target_offset(self) -> int:
+        """Смещение, к которому движется прокрутка"""
+        if self._animating or self._pending:
+            return self._target
+        if self._velocity:
+            return self._clamp(self._fling_position)
+        return self.current_offset
+
+    def request_offset(self, offset: int) -> None:
+        """Запрашивает смещение; будет применено последнее за кадр"""
+        self._stop_motion()
+        self._target = self._clamp(offset)
+        self._pending = True
+        self._schedule()
+
+    def scroll_by(self, delta: int, animated: bool = True) -> None:
+        target = self.target_offset() + delta
+        if animated:
+            self.animate_to(target)
+        else:
+            self.request_offset(target)
+
+    def animate_to(self, offset: int) -> None:
+        """Плавно прокручивает к смещению offset"""
+        self._velocity = 0.0
+        self._pending = False
+        self._target = self._clamp(offset)
+        self._animation_from = float(self.current_offset)
+        self._animation_start_ms = self._clock.elapsed()
+        self._animating = True
+        self._schedule()
+
+    def fling(self, velocity: float) -> None:
+        """Начинает кинетическую прокрутку со скоростью velocity (пикс/с)"""
+        if abs(velocity) < self.min_velocity:
+            return
+        self._animating = False
+        self._pending = False
+        self._velocity = velocity
+        self._fling_position = float(self.current_offset)
+        self._last_frame_ms = self._clock.elapsed()
+        self._schedule()
+
+    def stop(self) -> None:
+        self._stop_motion()
+        self._pending = False
+        self._timer.stop()
+
+    def flush(self) -> None:
+        """Немедленно применяет отложенное смещение"""
+        if self._pending:
+            self._pending = False
+            self._apply(self._target)
+
+    def _stop_motion(self) -> None:
+        self._animating = False
+        self._velocity = 0.0
+
+    def _schedule(self) -> None:
+        if self._timer.isActive():
+            return
+        # Первый запрос после простоя применяется сразу, а таймер запускается в любом случае:
+        # запросы до следующего кадра объединяются, кадр без запросов останавливает таймер
+        self._on_frame()
+        self._timer.start()
+
+    def _on_frame(self) -> None:
+        now = self._clock.elapsed()
+
+        if self._animating:
+            progress = min(1.0, (now - self._animation_start_ms) / max(1, self.animation_duration_ms))
+            # Плавное замедление к концу анимации
+            eased = 1 - (1 - progress) ** 3
+            self._apply(self._clamp(self._animation_from + (self._target - self._animation_from) * eased))
+            if progress >= 1.0:
+                self._animating = False
+        elif self._velocity:
+            dt = max(0, now - self._last_frame_ms) / 1000
+            self._last_frame_ms = now
+            self._fling_position += self._velocity * dt
+            self._velocity *= math.exp(-self.friction * dt)
+
+            offset = self._clamp(self._fling_position)
+            # Останавливаемся у края, только если движемся к нему (в начале у края dt почти 0)
+            at_edge = (offset == 0 and self._velocity < 0) or (offset == self.max_offset and self._velocity > 0)
+            if abs(self._velocity) < self.min_velocity or at_edge:
+                self._velocity = 0.0
+            self._apply(offset)
+        elif self._pending:
+            self._pending = False
+            self._apply(self._target)
+        else:
+            # Запросов за кадр не было - таймер больше не нужен
+            self._timer.stop()
+
+    def _apply(self, offset: int) -> None:
+        if offset != self.current_offset:
+            self.current_offset = offset
+            self.frame_offset.emit(offset)
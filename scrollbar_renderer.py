@@ -1,11 +1,13 @@
 # scrollbar_renderer.py
 from PySide6.QtWidgets import QScrollBar
 from PySide6.QtGui import QPainter
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QRect
 from renderer_interface import RendererInterface
+from scroll_scheduler import ScrollScheduler
 
 
 class ScrollBarRenderer(RendererInterface):
+    # Испускается не чаще раза за кадр с итоговым смещением кадра
     offset_changed = Signal(int)
 
     def __init__(self, parent):
@@ -17,18 +19,30 @@ class ScrollBarRenderer(RendererInterface):
         self.current_offset: int = 0
         self.const_width: int = 18
 
+        self.scheduler = ScrollScheduler(self)
+        self._syncing_scrollbar: bool = False
+
         self._setup_connections()
 
     def _setup_connections(self) -> None:
         self.scrollbar.valueChanged.connect(self._on_scrollbar_changed)
-        self.offset_changed.connect(self.scrollbar.setValue)
+        self.scheduler.frame_offset.connect(self._on_frame_offset)
 
     def _on_scrollbar_changed(self, value: int) -> None:
-        self.current_offset = value
-        self.offset_changed.emit(value)
+        # Изменение, вызванное синхронизацией со смещением кадра, не является новым запросом
+        if not self._syncing_scrollbar:
+            self.scheduler.request_offset(value)
+
+    def _on_frame_offset(self, offset: int) -> None:
+        self.current_offset = offset
+        self._syncing_scrollbar = True
+        self.scrollbar.setValue(offset)
+        self._syncing_scrollbar = False
+        self.offset_changed.emit(offset)
 
     def set_range(self, max_offset: int, page_step: int) -> None:
         self.max_offset_y = max_offset
+        self.scheduler.set_range(max_offset)
         if max_offset > 0:
             self.scrollbar.setVisible(True)
             self.scrollbar.setRange(0, max_offset)
@@ -37,13 +51,22 @@ class ScrollBarRenderer(RendererInterface):
             self.scrollbar.setVisible(False)
 
     def set_offset(self, offset: int) -> None:
-        self.current_offset = offset
-        self.scrollbar.setValue(offset)
+        self.scheduler.request_offset(offset)
+
+    def scroll_by(self, delta: int, animated: bool = True) -> None:
+        self.scheduler.scroll_by(delta, animated)
+
+    def fling(self, velocity: float) -> None:
+        self.scheduler.fling(velocity)
+
+    def flush(self) -> None:
+        """Немедленно применяет отложенное смещение"""
+        self.scheduler.flush()
 
     def get_offset(self) -> int:
         return self.current_offset
 
-    def render(self, painter: QPainter) -> None:
+    def render(self, painter: QPainter, rect: QRect = None) -> None:
         # Скроллбар рисуется автоматически как виджет
         pass
 
@@ -54,4 +77,4 @@ class ScrollBarRenderer(RendererInterface):
             self.const_width,
             height
         )
-        self.scrollbar.raise_()
\ No newline at end of file
+        self.scrollbar.raise_()
@@ -0,0 +1,121 @@
+# shared_cache.py
+import os
+import threading
+
+
+class SharedResourceCache:
+    """Общий для процесса кэш неизменяемых ресурсов со счетчиком ссылок
+
+    Значение создается фабрикой при первом запросе ключа и удаляется, когда
+    последний владелец освобождает ссылку.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Ключ -> [значение, количество ссылок]
+        self._entries: dict = {}
+
+    def acquire(self, key, factory):
+        """Возвращает значение по ключу, создавая его фабрикой при отсутствии, и увеличивает счетчик"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0]
+
+        # Фабрика может работать долго, поэтому вызывается без блокировки
+        value = factory()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [value, 0]
+            entry[1] += 1
+            return entry[0]
+
+    def acquire_existing(self, key):
+        """Возвращает уже созданное значение с увеличением счетчика или None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry[1] += 1
+            return entry[0]
+
+    def release(self, key) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._entries[key]
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def ref_count(self, key) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else 0
+
+
+class SharedLeases:
+    """Ссылки на общие ресурсы, которыми владеет один объект"""
+
+    def __init__(self) -> None:
+        # (id кэша, ключ) -> (кэш, ключ)
+        self._held: dict = {}
+
+    def acquire(self, cache: SharedResourceCache, key, factory):
+        value = cache.acquire(key, factory)
+        self._hold(cache, key)
+        return value
+
+    def acquire_existing(self, cache: SharedResourceCache, key):
+        value = cache.acquire_existing(key)
+        if value is not None:
+            self._hold(cache, key)
+        return value
+
+    def _hold(self, cache: SharedResourceCache, key) -> None:
+        held_key = (id(cache), key)
+        if held_key in self._held:
+            # Владелец держит не больше одной ссылки на ключ
+            cache.release(key)
+        else:
+            self._held[held_key] = (cache, key)
+
+    def holds(self, cache: SharedResourceCache, key) -> bool:
+        return (id(cache), key) in self._held
+
+    def release(self, cache: SharedResourceCache, key) -> None:
+        if self._held.pop((id(cache), key), None) is not None:
+            cache.release(key)
+
+    def release_all(self, cache: SharedResourceCache = None) -> None:
+        """Освобождает все ссылки (или только ссылки на cache)"""
+        for held_key, (held_cache, key) in list(self._held.items()):
+            if cache is None or held_cache is cache:
+                self.release(held_cache, key)
+
+
+def file_key(path: str):
+    """Ключ файла: абсолютный путь, время изменения и размер (изменение файла дает новый ключ)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return os.path.abspath(path), 0, 0
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+
+# Разобранные шаблоны: file_key -> кортеж FieldData
+shared_templates = SharedResourceCache()
+# Кэши фоновых изображений: абсолютный путь -> BackgroundImageCache
+shared_background_caches = SharedResourceCache()
+# Масштабированные фоны: (абсолютный путь, ширина) -> QPixmap
+shared_background_pixmaps = SharedResourceCache()
@@ -0,0 +1,104 @@
+# spatial_index.py
+
+
+class UniformGridIndex:
+    """Равномерная сетка над прямоугольниками полей в координатах фона
+
+    Каждое поле регистрируется во всех ячейках, которые пересекает. Поиск поля
+    в точке и полей в прямоугольнике просматривает только затронутые ячейки,
+    поэтому не зависит от общего количества полей. Добавление и удаление
+    обновляют только ячейки самого поля.
+    """
+
+    def __init__(self, cell_size: int = 256) -> None:
+        self.cell_size: int = cell_size
+        # (столбец, строка) -> {field_id: None}; dict сохраняет порядок добавления
+        self._cells: dict = {}
+        self._rects: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._rects)
+
+    def __contains__(self, field_id) -> bool:
+        return field_id in self._rects
+
+    def _cell_range(self, x: int, y: int, width: int, height: int):
+        size = self.cell_size
+        # Пустой прямоугольник все равно занимает ячейку своей точки
+        return (x // size, (x + max(width, 1) - 1) // size,
+                y // size, (y + max(height, 1) - 1) // size)
+
+    def add(self, field_id: str, x: int, y: int, width: int, height: int) -> None:
+        """Добавляет поле; существующее поле переносится на новое место"""
+        if field_id in self._rects:
+            self.remove(field_id)
+
+        self._rects[field_id] = (x, y, width, height)
+        first_column, last_column, first_row, last_row = self._cell_range(x, y, width, height)
+        cells = self._cells
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                cell = cells.get((column, row))
+                if cell is None:
+                    cell = cells[(column, row)] = {}
+                cell[field_id] = None
+
+    def remove(self, field_id: str) -> None:
+        rect = self._rects.pop(field_id, None)
+        if rect is None:
+            return
+
+        first_column, last_column, first_row, last_row = self._cell_range(*rect)
+        cells = self._cells
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                cell = cells.get((column, row))
+                if cell is not None:
+                    cell.pop(field_id, None)
+                    if not cell:
+                        del cells[(column, row)]
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._rects.clear()
+
+    def rect(self, field_id: str):
+        return self._rects.get(field_id)
+
+    def field_at(self, x: int, y: int):
+        """Возвращает id поля в точке (при перекрытии - добавленного последним) или None"""
+        cell = self._cells.get((x // self.cell_size, y // self.cell_size))
+        if not cell:
+            return None
+
+        rects = self._rects
+        for field_id in reversed(cell):
+            fx, fy, width, height = rects[field_id]
+            if fx <= x < fx + width and fy <= y < fy + height:
+                return field_id
+        return None
+
+    def fields_in_rect(self, x: int, y: int, width: int, height: int) -> list:
+        """Возвращает id полей, пересекающих прямоугольник"""
+        if width <= 0 or height <= 0:
+            return []
+
+        first_column, last_column, first_row, last_row = self._cell_range(x, y, width, height)
+        right, bottom = x + width, y + height
+        cells, rects = self._cells, self._rects
+        result = {}
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                cell = cells.get((column, row))
+                if not cell:
+                    continue
+                for field_id in cell:
+                    if field_id in result:
+                        continue
+                    fx, fy, field_width, field_height = rects[field_id]
+                    # Пустое поле ни с чем не пересекается, как и в field_at
+                    if field_width <= 0 or field_height <= 0:
+                        continue
+                    if fx < right and x < fx + field_width and fy < bottom and y < fy + field_height:
+                        result[field_id] = None
+        return list(result)
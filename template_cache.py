@@ -0,0 +1,225 @@
+# template_cache.py
+import hashlib
+import os
+import struct
+import sys
+from array import array
+from field_data import FieldData
+
+
+class CompiledTemplateCache:
+    """Кэш разобранных шаблонов полей в компактном двоичном формате
+
+    Файл кэша содержит заголовок (размер, mtime и sha1 исходного XML), блок строк,
+    индексы опций и кастомных свойств и массив записей фиксированного размера,
+    которые читаются через struct.iter_unpack без обхода дерева XML.
+    """
+
+    MAGIC = b"DLPT"
+    VERSION = 3
+    EXTENSION = ".dltc"
+
+    # magic, версия, mtime_ns и размер XML, sha1 содержимого XML
+    _HEADER = struct.Struct("<4sHqq20s")
+    # Смещение mtime_ns в заголовке (после magic и версии)
+    _MTIME_OFFSET = struct.calcsize("<4sH")
+    # количество записей, длина блока строк, количество индексов опций и свойств
+    _COUNTS = struct.Struct("<4I")
+    # Поля FieldData в порядке объявления; строки - индексы в блоке строк,
+    # опции и свойства - (начало, количество) в массивах индексов
+    _RECORD = struct.Struct("<I4iIiI?8I")
+    _NONE = 0xFFFFFFFF
+
+    def __init__(self, cache_dir: str = None) -> None:
+        # Без каталога кэш пишется рядом с XML
+        self.cache_dir = cache_dir
+
+    def cache_path(self, xml_path: str) -> str:
+        if self.cache_dir is None:
+            return xml_path + self.EXTENSION
+        key = hashlib.sha1(os.path.abspath(xml_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + self.EXTENSION)
+
+    def load(self, xml_path: str) -> list:
+        """Возвращает поля шаблона из кэша или разбирает XML и сохраняет результат"""
+        return list(self.iter_fields(xml_path))
+
+    def iter_fields(self, xml_path: str):
+        """Итерирует поля шаблона; после полного разбора XML результат сохраняется в кэш"""
+        fields = self.read(xml_path)
+        if fields is not None:
+            yield from fields
+            return
+
+        from xml_field_reader import XMLFieldReader
+        fields = []
+        for field_data in XMLFieldReader().iter_fields_from_xml(xml_path):
+            fields.append(field_data)
+            yield field_data
+
+        # Кэш пишется только после успешного разбора всего документа
+        self.write(xml_path, fields)
+
+    def read(self, xml_path: str):
+        """Читает поля из кэша, если он соответствует текущему XML, иначе возвращает None"""
+        try:
+            stat = os.stat(xml_path)
+            with open(self.cache_path(xml_path), "rb") as cache_file:
+                data = cache_file.read()
+        except OSError:
+            return None
+
+        if len(data) < self._HEADER.size + self._COUNTS.size:
+            return None
+
+        magic, version, mtime_ns, size, digest = self._HEADER.unpack_from(data, 0)
+        if magic != self.MAGIC or version != self.VERSION or size != stat.st_size:
+            return None
+        # Изменилось только время модификации - сверяем содержимое
+        refresh_mtime = mtime_ns != stat.st_mtime_ns
+        if refresh_mtime and digest != self._hash_file(xml_path):
+            return None
+
+        try:
+            fields = self._decode(data, self._HEADER.size)
+        except (struct.error, UnicodeDecodeError, IndexError, ValueError):
+            return None
+        if refresh_mtime:
+            # Содержимое то же - следующие загрузки обойдутся без хеширования
+            self._update_mtime(xml_path, stat.st_mtime_ns)
+        return fields
+
+    def _update_mtime(self, xml_path: str, mtime_ns: int) -> None:
+        """Записывает новое время модификации XML в заголовок существующего файла кэша"""
+        try:
+            with open(self.cache_path(xml_path), "r+b") as cache_file:
+                cache_file.seek(self._MTIME_OFFSET)
+                cache_file.write(struct.pack("<q", mtime_ns))
+        except OSError as e:
+            print(f"Ошибка при записи кэша шаблона {xml_path}: {e}")
+
+    def write(self, xml_path: str, fields: list) -> None:
+        """Сохраняет разобранные поля в файл кэша"""
+        try:
+            stat = os.stat(xml_path)
+            header = self._HEADER.pack(self.MAGIC, self.VERSION, stat.st_mtime_ns,
+                                       stat.st_size, self._hash_file(xml_path))
+            body = self._encode(fields)
+
+            path = self.cache_path(xml_path)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Запись через временный файл, чтобы читатель не увидел неполный кэш
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as cache_file:
+                cache_file.write(header)
+                cache_file.write(body)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Ошибка при записи кэша шаблона {xml_path}: {e}")
+
+    def _hash_file(self, path: str) -> bytes:
+        with open(path, "rb") as xml_file:
+            return hashlib.sha1(xml_file.read()).digest()
+
+    def _encode(self, fields: list) -> bytes:
+        strings: list = []
+        string_index: dict = {}
+
+        def intern(value) -> int:
+            if value is None:
+                return self._NONE
+            index = string_index.get(value)
+            if index is None:
+                index = len(strings)
+                string_index[value] = index
+                strings.append(value)
+            return index
+
+        options = array("I")
+        properties = array("I")
+        records = bytearray()
+
+        for field_data in fields:
+            options_start = len(options)
+            for option in field_data.options:
+                options.append(intern(option))
+
+            properties_start = len(properties) // 2
+            for key, value in field_data.custom_properties.items():
+                properties.append(intern(key))
+                properties.append(intern(value))
+
+            records += self._RECORD.pack(
+                intern(field_data.widget_type),
+                field_data.x, field_data.y, field_data.width, field_data.height,
+                intern(field_data.default_text),
+                field_data.font_size,
+                intern(field_data.field_id),
+                bool(field_data.bold),
+                intern(field_data.alignment),
+                intern(field_data.background_color),
+                intern(field_data.text_color),
+                options_start, len(field_data.options),
+                intern(field_data.custom_widget_class),
+                properties_start, len(field_data.custom_properties)
+            )
+
+        # В XML 1.0 символ NUL недопустим, поэтому он безопасен как разделитель
+        string_blob = "\0".join(strings).encode("utf-8")
+        if sys.byteorder == "big":
+            options.byteswap()
+            properties.byteswap()
+
+        return b"".join((
+            self._COUNTS.pack(len(fields), len(string_blob), len(options), len(properties) // 2),
+            string_blob,
+            options.tobytes(),
+            properties.tobytes(),
+            bytes(records)
+        ))
+
+    def _decode(self, data: bytes, offset: int) -> list:
+        record_count, blob_size, options_count, properties_count = self._COUNTS.unpack_from(data, offset)
+        offset += self._COUNTS.size
+
+        strings = data[offset:offset + blob_size].decode("utf-8").split("\0")
+        offset += blob_size
+
+        options = array("I")
+        options.frombytes(data[offset:offset + options_count * 4])
+        offset += options_count * 4
+
+        properties = array("I")
+        properties.frombytes(data[offset:offset + properties_count * 8])
+        offset += properties_count * 8
+
+        if sys.byteorder == "big":
+            options.byteswap()
+            properties.byteswap()
+
+        records_size = record_count * self._RECORD.size
+        if len(data) - offset != records_size:
+            raise ValueError("Неверный размер блока записей")
+
+        none = self._NONE
+
+        def text(index: int):
+            return None if index == none else strings[index]
+
+        fields = []
+        for (widget_type, x, y, width, height, default_text, font_size, field_id, bold, alignment,
+             background_color, text_color, options_start, options_len, custom_widget_class,
+             properties_start, properties_len) in self._RECORD.iter_unpack(data[offset:]):
+            fields.append(FieldData(
+                text(widget_type), x, y, width, height, text(default_text), font_size,
+                text(field_id), bold, text(alignment), text(background_color), text(text_color),
+                [text(index) for index in options[options_start:options_start + options_len]],
+                text(custom_widget_class),
+                {text(properties[i]): text(properties[i + 1])
+                 for i in range(properties_start * 2, (properties_start + properties_len) * 2, 2)}
+            ))
+
+        return fields
@@ -0,0 +1,166 @@
+# test_field_geometry.py
+import pytest
+
+import field_geometry
+from field_geometry import FieldGeometryTable
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """Прогоняет тест и с NumPy, и с запасным путем на чистом Python"""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(field_geometry, "np", None)
+    return request.param
+
+
+def make_table(count: int) -> FieldGeometryTable:
+    table = FieldGeometryTable()
+    # y в обратном порядке, чтобы порядок строк не совпадал с порядком по вертикали
+    for i in range(count):
+        table.add(f"f{i}", i * 3, (count - i) * 40, 50 + i, 30)
+    return table
+
+
+def test_add_and_rect():
+    table = FieldGeometryTable()
+    table.add("a", 1, 2, 3, 4)
+    assert len(table) == 1
+    assert "a" in table
+    assert "b" not in table
+    assert table.rect("a") == (1, 2, 3, 4)
+
+
+def test_add_existing_updates():
+    table = FieldGeometryTable()
+    table.add("a", 1, 2, 3, 4)
+    table.add("a", 5, 6, 7, 8)
+    assert len(table) == 1
+    assert table.rect("a") == (5, 6, 7, 8)
+
+
+def test_remove_moves_last_row():
+    table = FieldGeometryTable()
+    table.add("a", 0, 0, 10, 10)
+    table.add("b", 1, 100, 11, 11)
+    table.add("c", 2, 200, 12, 12)
+
+    table.remove("a")
+    assert len(table) == 2
+    assert "a" not in table
+    assert table.rect("b") == (1, 100, 11, 11)
+    assert table.rect("c") == (2, 200, 12, 12)
+    assert len(table.x) == len(table.y) == len(table.width) == len(table.height) == 2
+
+    # Повторное удаление и удаление отсутствующего поля ничего не делают
+    table.remove("a")
+    table.remove("missing")
+    assert len(table) == 2
+
+
+def test_remove_keeps_applied_state_of_moved_row():
+    table = FieldGeometryTable()
+    table.add("a", 0, 0, 10, 10)
+    table.add("b", 0, 50, 10, 10)
+    assert len(table.changed_rects(["a", "b"], 0, 0)) == 2
+
+    table.remove("a")
+    # Перенесенная строка "b" сохраняет примененный прямоугольник
+    assert table.changed_rects(["b"], 0, 0) == []
+
+
+def test_clear():
+    table = make_table(5)
+    table.clear()
+    assert len(table) == 0
+    assert table.query(-1000, 1000) == []
+    table.add("a", 0, 0, 10, 10)
+    assert table.query(0, 10) == ["a"]
+
+
+@pytest.mark.usefixtures("backend")
+def test_query_band():
+    table = FieldGeometryTable()
+    table.add("top", 0, 0, 10, 20)
+    table.add("middle", 0, 100, 10, 20)
+    table.add("tall", 0, 50, 10, 200)
+    table.add("bottom", 0, 300, 10, 20)
+
+    assert sorted(table.query(0, 20)) == ["top"]
+    # Поле, начинающееся выше полосы, попадает в нее за счет высоты
+    assert sorted(table.query(200, 240)) == ["tall"]
+    # Полоса полуоткрыта: поле, начинающееся на bottom, не попадает
+    assert sorted(table.query(20, 50)) == []
+    assert sorted(table.query(0, 1000)) == ["bottom", "middle", "tall", "top"]
+
+
+@pytest.mark.usefixtures("backend")
+def test_query_matches_brute_force_after_changes():
+    table = make_table(40)
+    table.update("f3", 0, 5, 10, 10)
+    table.remove("f10")
+    table.add("late", 0, 777, 10, 90)
+
+    for top, bottom in ((0, 100), (150, 420), (700, 800), (1500, 2000)):
+        expected = sorted(
+            field_id for field_id in (f"f{i}" for i in range(40) if i != 10)
+            if table.rect(field_id)[1] < bottom and table.rect(field_id)[1] + table.rect(field_id)[3] > top
+        )
+        if 777 < bottom and 777 + 90 > top:
+            expected = sorted(expected + ["late"])
+        assert sorted(table.query(top, bottom)) == expected
+
+
+@pytest.mark.parametrize("count", [3, 40])
+@pytest.mark.usefixtures("backend")
+def test_changed_rects_returns_only_changes(count):
+    table = make_table(count)
+    ids = [f"f{i}" for i in range(count)]
+
+    first = table.changed_rects(ids, 10, 100)
+    assert [item[0] for item in first] == ids
+    for field_id, x, y, width, height in first:
+        fx, fy, fwidth, fheight = table.rect(field_id)
+        assert (x, y, width, height) == (fx + 10, fy - 100, fwidth, fheight)
+
+    # Повторный вызов с теми же смещениями ничего не меняет
+    assert table.changed_rects(ids, 10, 100) == []
+
+    # Изменение смещения затрагивает все поля
+    assert len(table.changed_rects(ids, 10, 101)) == count
+
+    # Обновление одного поля дает одну запись
+    table.update("f1", 500, 600, 70, 80)
+    assert table.changed_rects(ids, 10, 101) == [("f1", 510, 499, 70, 80)]
+
+
+@pytest.mark.usefixtures("backend")
+def test_invalidate():
+    table = make_table(20)
+    ids = [f"f{i}" for i in range(20)]
+    table.changed_rects(ids, 0, 0)
+
+    table.invalidate("f2")
+    table.invalidate("missing")
+    assert [item[0] for item in table.changed_rects(ids, 0, 0)] == ["f2"]
+
+    table.invalidate_all()
+    assert len(table.changed_rects(ids, 0, 0)) == 20
+
+
+def test_changed_rects_empty():
+    assert FieldGeometryTable().changed_rects([], 0, 0) == []
+
+
+def test_columns_resize_after_numpy_path():
+    pytest.importorskip("numpy")
+    table = make_table(40)
+    ids = [f"f{i}" for i in range(40)]
+    table.changed_rects(ids, 0, 0)
+    table.query(0, 100)
+
+    # Представления NumPy не должны удерживать буферы столбцов
+    table.add("extra", 0, 0, 10, 10)
+    table.remove("f0")
+    assert len(table) == 40
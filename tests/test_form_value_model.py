@@ -0,0 +1,161 @@
+# test_form_value_model.py
+from types import SimpleNamespace
+
+import pytest
+
+QtCore = pytest.importorskip("PySide6.QtCore")
+
+from form_value_model import FormValueModel  # noqa: E402
+
+
+class FakeEditor(QtCore.QObject):
+    """Редактор без виджетов: значение и сигнал его изменения"""
+    edited = QtCore.Signal(str)
+
+    def __init__(self, value="", allowed=None) -> None:
+        super().__init__()
+        self.text = value
+        # Допустимые значения, как у выпадающего списка
+        self.allowed = allowed
+
+    def set_text(self, value) -> None:
+        if self.allowed is None or value in self.allowed:
+            self.text = value
+
+    def user_edit(self, value) -> None:
+        self.text = value
+        self.edited.emit(value)
+
+
+ACCESSOR = SimpleNamespace(getter=lambda editor: editor.text,
+                           setter=FakeEditor.set_text, signal="edited")
+
+
+def test_set_value_versions_and_signal():
+    model = FormValueModel()
+    emitted = []
+    model.value_changed.connect(lambda field_id, value: emitted.append((field_id, value)))
+
+    assert model.set_value("a", 1)
+    assert model.version == 1
+    # Повторное значение не считается изменением
+    assert not model.set_value("a", 1)
+    assert model.version == 1
+    assert model.set_value("b", 2)
+    assert model.set_value("a", 3)
+    assert model.version == 3
+
+    assert emitted == [("a", 1), ("b", 2), ("a", 3)]
+    assert model.value("a") == 3
+    assert model.value("missing", "x") == "x"
+    assert model.values() == {"a": 3, "b": 2}
+    assert "a" in model and len(model) == 2
+
+
+def test_changed_since():
+    model = FormValueModel()
+    model.set_value("a", 1)
+    version = model.version
+    model.set_value("b", 2)
+    model.set_value("c", 3)
+
+    assert model.changed_since(0) == {"a": 1, "b": 2, "c": 3}
+    assert model.changed_since(version) == {"b": 2, "c": 3}
+    assert model.changed_since(model.version) == {}
+
+
+def test_dirty_fields_and_mark_clean():
+    model = FormValueModel()
+    model.set_value("a", 1)
+    model.set_value("b", 2)
+    model.set_value("c", 3)
+    assert model.dirty_fields() == {"a", "b", "c"}
+
+    model.mark_clean(["a"])
+    assert not model.is_dirty("a")
+    assert model.dirty_fields() == {"b", "c"}
+
+    model.mark_clean()
+    assert model.dirty_fields() == set()
+    # Версии не сбрасываются при сохранении
+    assert model.changed_since(0) == {"a": 1, "b": 2, "c": 3}
+
+
+def test_reset_value_is_not_dirty():
+    model = FormValueModel()
+    model.set_value("a", 1)
+    model.reset_value("a", 10)
+
+    assert model.value("a") == 10
+    assert not model.is_dirty("a")
+    assert model.changed_since(0) == {}
+    assert model.set_value("a", 11)
+    assert model.is_dirty("a")
+
+
+def test_remove_and_clear():
+    model = FormValueModel()
+    model.set_value("a", 1)
+    model.set_value("b", 2)
+
+    model.remove("a")
+    model.remove("missing")
+    assert "a" not in model
+    assert model.dirty_fields() == {"b"}
+    assert model.changed_since(0) == {"b": 2}
+
+    model.clear()
+    assert len(model) == 0
+    assert model.dirty_fields() == set()
+
+
+def test_bind_pushes_value_and_receives_edits():
+    model = FormValueModel()
+    model.reset_value("a", "model")
+    editor = FakeEditor("widget")
+
+    model.bind("a", editor, ACCESSOR)
+    assert editor.text == "model"
+    assert model.bound_widget("a") is editor
+
+    editor.user_edit("typed")
+    assert model.value("a") == "typed"
+    assert model.is_dirty("a")
+
+    # Значение из модели записывается в редактор
+    model.set_value("a", "set")
+    assert editor.text == "set"
+
+
+def test_bind_reads_widget_value_for_new_field():
+    model = FormValueModel()
+    editor = FakeEditor("widget")
+    model.bind("a", editor, ACCESSOR)
+    assert model.value("a") == "widget"
+    assert not model.is_dirty("a")
+
+
+def test_rejected_value_keeps_editor_value():
+    model = FormValueModel()
+    editor = FakeEditor("x", allowed={"x", "y"})
+    model.bind("a", editor, ACCESSOR)
+
+    assert not model.set_value("a", "z")
+    assert model.value("a") == "x"
+    assert model.set_value("a", "y")
+    assert model.value("a") == "y"
+
+
+def test_unbind_stops_updates():
+    model = FormValueModel()
+    editor = FakeEditor("widget")
+    model.bind("a", editor, ACCESSOR)
+    model.unbind("a")
+
+    editor.user_edit("typed")
+    assert model.value("a") == "widget"
+    assert model.bound_widget("a") is None
+    # Значение переживает удаление виджета
+    model.set_value("a", "kept")
+    assert editor.text == "typed"
+    assert model.value("a") == "kept"
@@ -0,0 +1,136 @@
+# test_shared_cache.py
+import os
+
+from shared_cache import SharedLeases, SharedResourceCache, file_key
+
+
+def counting_factory(value):
+    calls = []
+
+    def factory():
+        calls.append(value)
+        return value
+    return factory, calls
+
+
+def test_factory_called_once_and_refcount():
+    cache = SharedResourceCache()
+    factory, calls = counting_factory("value")
+
+    assert cache.acquire("key", factory) == "value"
+    assert cache.acquire("key", factory) == "value"
+    assert calls == ["value"]
+    assert cache.ref_count("key") == 2
+    assert "key" in cache and len(cache) == 1
+
+    cache.release("key")
+    assert cache.ref_count("key") == 1
+    assert "key" in cache
+
+    # Последняя ссылка удаляет значение
+    cache.release("key")
+    assert cache.ref_count("key") == 0
+    assert "key" not in cache and len(cache) == 0
+
+    # Освобождение отсутствующего ключа ничего не делает
+    cache.release("key")
+    assert cache.ref_count("key") == 0
+
+
+def test_recreated_after_eviction():
+    cache = SharedResourceCache()
+    factory, calls = counting_factory("value")
+    cache.acquire("key", factory)
+    cache.release("key")
+    cache.acquire("key", factory)
+    assert calls == ["value", "value"]
+
+
+def test_acquire_existing():
+    cache = SharedResourceCache()
+    assert cache.acquire_existing("key") is None
+    assert cache.ref_count("key") == 0
+
+    cache.acquire("key", lambda: "value")
+    assert cache.acquire_existing("key") == "value"
+    assert cache.ref_count("key") == 2
+
+
+def test_factory_error_leaves_no_entry():
+    cache = SharedResourceCache()
+
+    def failing():
+        raise OSError("broken")
+
+    try:
+        cache.acquire("key", failing)
+    except OSError:
+        pass
+    assert "key" not in cache
+
+
+def test_lease_holds_one_reference_per_key():
+    cache = SharedResourceCache()
+    leases = SharedLeases()
+    factory, calls = counting_factory("value")
+
+    leases.acquire(cache, "key", factory)
+    leases.acquire(cache, "key", factory)
+    assert leases.acquire_existing(cache, "key") == "value"
+    assert cache.ref_count("key") == 1
+    assert leases.holds(cache, "key")
+
+    other = SharedLeases()
+    other.acquire(cache, "key", factory)
+    assert cache.ref_count("key") == 2
+    assert calls == ["value"]
+
+    leases.release(cache, "key")
+    assert not leases.holds(cache, "key")
+    assert cache.ref_count("key") == 1
+    # Повторное освобождение не трогает ссылку другого владельца
+    leases.release(cache, "key")
+    assert cache.ref_count("key") == 1
+
+    other.release(cache, "key")
+    assert "key" not in cache
+
+
+def test_lease_acquire_existing_missing():
+    cache = SharedResourceCache()
+    leases = SharedLeases()
+    assert leases.acquire_existing(cache, "key") is None
+    assert not leases.holds(cache, "key")
+
+
+def test_release_all():
+    first, second = SharedResourceCache(), SharedResourceCache()
+    leases = SharedLeases()
+    leases.acquire(first, "a", lambda: 1)
+    leases.acquire(first, "b", lambda: 2)
+    leases.acquire(second, "a", lambda: 3)
+
+    # Освобождаются только ссылки на указанный кэш
+    leases.release_all(first)
+    assert len(first) == 0
+    assert second.ref_count("a") == 1
+    assert leases.holds(second, "a")
+
+    leases.release_all()
+    assert len(second) == 0
+    assert not leases.holds(second, "a")
+
+
+def test_file_key(tmp_path):
+    path = tmp_path / "template.xml"
+    path.write_text("<fields/>", encoding="utf-8")
+    key = file_key(str(path))
+    assert key[0] == os.path.abspath(str(path))
+    assert file_key(str(path)) == key
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert file_key(str(path)) != key
+
+    missing = str(tmp_path / "missing.xml")
+    assert file_key(missing) == (os.path.abspath(missing), 0, 0)
@@ -0,0 +1,123 @@
+# test_spatial_index.py
+import random
+
+from spatial_index import UniformGridIndex
+
+
+def brute_force(index: UniformGridIndex, ids, x, y, width, height) -> list:
+    result = []
+    for field_id in ids:
+        fx, fy, field_width, field_height = index.rect(field_id)
+        if fx < x + width and x < fx + field_width and fy < y + height and y < fy + field_height:
+            result.append(field_id)
+    return sorted(result)
+
+
+def test_add_and_rect():
+    index = UniformGridIndex(cell_size=100)
+    index.add("a", 10, 20, 30, 40)
+    assert len(index) == 1
+    assert "a" in index
+    assert index.rect("a") == (10, 20, 30, 40)
+    assert index.rect("missing") is None
+
+
+def test_field_at_cell_edges():
+    index = UniformGridIndex(cell_size=100)
+    # Поле заканчивается ровно на границе ячейки
+    index.add("left", 0, 0, 100, 100)
+    # Поле начинается ровно на границе и пересекает несколько ячеек
+    index.add("span", 100, 0, 150, 250)
+
+    assert index.field_at(0, 0) == "left"
+    assert index.field_at(99, 99) == "left"
+    assert index.field_at(100, 0) == "span"
+    assert index.field_at(249, 249) == "span"
+    assert index.field_at(250, 0) is None
+    assert index.field_at(100, 250) is None
+    assert index.field_at(0, 100) is None
+
+
+def test_field_at_prefers_last_added():
+    index = UniformGridIndex(cell_size=64)
+    index.add("under", 0, 0, 200, 200)
+    index.add("over", 50, 50, 20, 20)
+    assert index.field_at(60, 60) == "over"
+    assert index.field_at(10, 10) == "under"
+
+    # Повторное добавление переносит поле наверх
+    index.add("under", 0, 0, 200, 200)
+    assert index.field_at(60, 60) == "under"
+
+
+def test_readd_moves_field():
+    index = UniformGridIndex(cell_size=100)
+    index.add("a", 0, 0, 50, 50)
+    index.add("a", 500, 500, 50, 50)
+    assert len(index) == 1
+    assert index.field_at(10, 10) is None
+    assert index.field_at(510, 510) == "a"
+    assert index.fields_in_rect(0, 0, 100, 100) == []
+
+
+def test_remove_clears_cells():
+    index = UniformGridIndex(cell_size=100)
+    index.add("a", 50, 50, 300, 300)
+    index.add("b", 0, 0, 10, 10)
+    index.remove("a")
+    index.remove("missing")
+
+    assert "a" not in index
+    assert index.field_at(200, 200) is None
+    assert index.fields_in_rect(0, 0, 1000, 1000) == ["b"]
+    # Пустые ячейки удаляются
+    assert set(index._cells) == {(0, 0)}
+
+    index.clear()
+    assert len(index) == 0
+    assert index._cells == {}
+
+
+def test_empty_rect_occupies_own_cell():
+    index = UniformGridIndex(cell_size=100)
+    index.add("empty", 100, 100, 0, 0)
+    assert set(index._cells) == {(1, 1)}
+    assert index.field_at(100, 100) is None
+    assert index.fields_in_rect(0, 0, 500, 500) == []
+
+
+def test_fields_in_rect_non_positive_size():
+    index = UniformGridIndex(cell_size=100)
+    index.add("a", 0, 0, 50, 50)
+    assert index.fields_in_rect(0, 0, 0, 10) == []
+    assert index.fields_in_rect(0, 0, 10, -1) == []
+
+
+def test_fields_in_rect_edges():
+    index = UniformGridIndex(cell_size=100)
+    index.add("a", 0, 0, 100, 100)
+    # Прямоугольник, касающийся поля только границей, его не пересекает
+    assert index.fields_in_rect(100, 0, 50, 50) == []
+    assert index.fields_in_rect(99, 99, 1, 1) == ["a"]
+    # Поле в нескольких ячейках возвращается один раз
+    index.add("wide", 0, 200, 450, 10)
+    assert index.fields_in_rect(0, 150, 500, 100) == ["wide"]
+
+
+def test_fields_in_rect_matches_brute_force():
+    rng = random.Random(1234)
+    index = UniformGridIndex(cell_size=64)
+    ids = []
+    for i in range(300):
+        field_id = f"f{i}"
+        ids.append(field_id)
+        index.add(field_id, rng.randrange(0, 2000), rng.randrange(0, 4000),
+                  rng.randrange(1, 300), rng.randrange(1, 120))
+    for field_id in ids[::7]:
+        index.remove(field_id)
+    ids = [field_id for field_id in ids if field_id in index]
+
+    for _ in range(200):
+        x, y = rng.randrange(-100, 2100), rng.randrange(-100, 4100)
+        width, height = rng.randrange(1, 500), rng.randrange(1, 500)
+        assert sorted(index.fields_in_rect(x, y, width, height)) == brute_force(index, ids, x, y, width, height)
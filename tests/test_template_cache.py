@@ -0,0 +1,199 @@
+# test_template_cache.py
+import os
+import struct
+
+import pytest
+
+from field_data import FieldData
+from template_cache import CompiledTemplateCache
+
+TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<fields>
+    <field>
+        <type>line_edit</type>
+        <x>10</x>
+        <y>-20</y>
+        <width>200</width>
+        <height>30</height>
+        <default_text>Иванов</default_text>
+        <font_size>14</font_size>
+        <field_id>surname</field_id>
+        <bold>true</bold>
+        <alignment>center</alignment>
+        <background_color>#ffffff</background_color>
+        <text_color>red</text_color>
+    </field>
+    <field>
+        <type>combo_box</type>
+        <field_id>gender</field_id>
+        <default_text>м</default_text>
+        <options>
+            <option>м</option>
+            <option>ж</option>
+            <option/>
+        </options>
+    </field>
+    <field>
+        <type>custom</type>
+        <field_id>photo</field_id>
+        <custom_widget_class>PhotoWidget</custom_widget_class>
+        <custom_properties>
+            <path>photo.png</path>
+            <empty/>
+        </custom_properties>
+    </field>
+    <field/>
+</fields>
+"""
+
+
+@pytest.fixture
+def xml_path(tmp_path):
+    path = tmp_path / "template.xml"
+    path.write_text(TEMPLATE, encoding="utf-8")
+    return str(path)
+
+
+def expected_fields() -> list:
+    return [
+        FieldData("line_edit", 10, -20, 200, 30, "Иванов", 14, "surname", True, "center", "#ffffff", "red"),
+        FieldData("combo_box", default_text="м", field_id="gender", options=["м", "ж", None]),
+        FieldData("custom", field_id="photo", custom_widget_class="PhotoWidget",
+                  custom_properties={"path": "photo.png", "empty": None}),
+        FieldData(),
+    ]
+
+
+def test_load_writes_cache_and_round_trips(xml_path):
+    cache = CompiledTemplateCache()
+    assert cache.read(xml_path) is None
+
+    assert cache.load(xml_path) == expected_fields()
+    assert os.path.exists(cache.cache_path(xml_path))
+    assert cache.read(xml_path) == expected_fields()
+
+
+def test_write_read_round_trip(xml_path):
+    cache = CompiledTemplateCache()
+    fields = expected_fields() + [FieldData(field_id="", options=["", "a\tb"], custom_widget_class="")]
+    cache.write(xml_path, fields)
+    assert cache.read(xml_path) == fields
+
+
+def test_empty_template(tmp_path):
+    path = tmp_path / "empty.xml"
+    path.write_text("<fields/>", encoding="utf-8")
+    cache = CompiledTemplateCache()
+    assert cache.load(str(path)) == []
+    assert cache.read(str(path)) == []
+
+
+def test_iter_fields_closed_early_does_not_write(xml_path):
+    cache = CompiledTemplateCache()
+    fields = cache.iter_fields(xml_path)
+    next(fields)
+    fields.close()
+    assert not os.path.exists(cache.cache_path(xml_path))
+
+
+def test_size_change_invalidates(xml_path):
+    cache = CompiledTemplateCache()
+    cache.load(xml_path)
+
+    with open(xml_path, "a", encoding="utf-8") as xml_file:
+        xml_file.write("\n")
+    assert cache.read(xml_path) is None
+
+
+def test_content_change_with_same_size_invalidates(xml_path):
+    cache = CompiledTemplateCache()
+    cache.load(xml_path)
+    stat = os.stat(xml_path)
+
+    changed = TEMPLATE.replace("<x>10</x>", "<x>11</x>")
+    assert len(changed) == len(TEMPLATE)
+    with open(xml_path, "w", encoding="utf-8") as xml_file:
+        xml_file.write(changed)
+    os.utime(xml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cache.read(xml_path) is None
+    assert cache.load(xml_path)[0].x == 11
+
+
+def test_touched_file_refreshes_header(xml_path, monkeypatch):
+    cache = CompiledTemplateCache()
+    cache.load(xml_path)
+    stat = os.stat(xml_path)
+    new_mtime = stat.st_mtime_ns + 5_000_000_000
+    os.utime(xml_path, ns=(stat.st_atime_ns, new_mtime))
+
+    calls = []
+    original_hash = cache._hash_file
+
+    def counting_hash(path):
+        calls.append(path)
+        return original_hash(path)
+
+    monkeypatch.setattr(cache, "_hash_file", counting_hash)
+
+    # Время изменилось, содержимое то же - кэш действителен после сверки хеша
+    assert cache.read(xml_path) == expected_fields()
+    assert len(calls) == 1
+
+    with open(cache.cache_path(xml_path), "rb") as cache_file:
+        data = cache_file.read()
+    assert struct.unpack_from("<q", data, CompiledTemplateCache._MTIME_OFFSET)[0] == new_mtime
+
+    # Следующее чтение обходится без хеширования
+    assert cache.read(xml_path) == expected_fields()
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("damage", ["magic", "version", "truncate", "extra", "header_only"])
+def test_corrupt_cache_returns_none(xml_path, damage):
+    cache = CompiledTemplateCache()
+    cache.load(xml_path)
+    path = cache.cache_path(xml_path)
+    with open(path, "rb") as cache_file:
+        data = bytearray(cache_file.read())
+
+    if damage == "magic":
+        data[0:4] = b"XXXX"
+    elif damage == "version":
+        struct.pack_into("<H", data, 4, CompiledTemplateCache.VERSION + 1)
+    elif damage == "truncate":
+        del data[-5:]
+    elif damage == "extra":
+        data += b"\0"
+    else:
+        del data[CompiledTemplateCache._HEADER.size:]
+
+    with open(path, "wb") as cache_file:
+        cache_file.write(data)
+    assert cache.read(xml_path) is None
+    # Поврежденный кэш перезаписывается при следующей загрузке
+    assert cache.load(xml_path) == expected_fields()
+    assert cache.read(xml_path) == expected_fields()
+
+
+def test_missing_xml(tmp_path):
+    cache = CompiledTemplateCache()
+    assert cache.read(str(tmp_path / "missing.xml")) is None
+
+
+def test_cache_dir(xml_path, tmp_path):
+    cache_dir = tmp_path / "cache" / "nested"
+    cache = CompiledTemplateCache(str(cache_dir))
+    path = cache.cache_path(xml_path)
+    assert os.path.dirname(path) == str(cache_dir)
+    assert path.endswith(CompiledTemplateCache.EXTENSION)
+    assert cache.cache_path(xml_path) != cache.cache_path(xml_path + "2")
+
+    cache.load(xml_path)
+    assert os.path.exists(path)
+    assert not os.path.exists(xml_path + CompiledTemplateCache.EXTENSION)
+    assert cache.read(xml_path) == expected_fields()
+
+
+def test_default_cache_path(xml_path):
+    assert CompiledTemplateCache().cache_path(xml_path) == xml_path + CompiledTemplateCache.EXTENSION
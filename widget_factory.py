@@ -3,67 +3,173 @@ from PySide6.QtWidgets import (QWidget, QLabel, QLineEdit, QTextEdit,
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
 from abc import ABC, abstractmethod
+from widget_registry import WidgetRegistry
 
 
 class WidgetFactoryInterface(ABC):
+    # Увеличивается при каждом изменении общей таблицы стилей формы
+    style_sheet_version: int = 0
+
     @abstractmethod
     def create_widget(self, field_data: 'FieldData') -> QWidget:
         pass
 
+    def style_sheet(self) -> str:
+        """Общая таблица стилей, которую нужно установить родителю полей"""
+        return ""
+
+    def prepare_styles(self, fields) -> None:
+        """Заранее добавляет в общую таблицу стили полей шаблона"""
+        pass
+
 
 class DefaultWidgetFactory(WidgetFactoryInterface):
+    # Динамическое свойство, по которому виджет выбирает вариант стиля из общей таблицы
+    STYLE_PROPERTY = "dlpStyle"
+
+    INPUT_STYLE = ("background-color: {background}; border: 1px solid #cccccc; border-radius: 3px; "
+                   "padding: 2px 5px; color: black;")
+    INPUT_BACKGROUND = "rgba(255, 255, 255, 0.3)"
+    ERROR_STYLE = "background-color: red; color: white;"
+
+    def __init__(self) -> None:
+        # Шрифты по (размер, жирность) - QFont неявно разделяется между виджетами
+        self._fonts: dict = {}
+        # Объявления стиля -> имя варианта и правила общей таблицы стилей
+        self._style_variants: dict = {}
+        self._style_rules: list = []
+        self.style_sheet_version = 0
+        # Пул освобожденных виджетов (None - виджеты всегда создаются заново)
+        self.widget_pool = None
+
+        # Создание виджета выбирается по типу поля без цепочки сравнений
+        self.registry = WidgetRegistry()
+        self.registry.register("label", self._create_label)
+        self.registry.register("line_edit", self._create_line_edit)
+        self.registry.register("text_edit", self._create_text_edit)
+        self.registry.register("checkbox", self._create_checkbox)
+        self.registry.register("combo_box", self._create_combo_box)
+        self.registry.register("custom", self._create_custom_widget)
+
+    def register_custom_widget(self, widget_type: str, creator_func) -> None:
+        """Регистрирует функцию creator_func(field_data) -> QWidget для типа поля"""
+        self.registry.register(widget_type, creator_func)
+
+    def validate_fields(self, fields) -> dict:
+        """Проверяет, что для всех полей шаблона можно создать виджеты"""
+        return self.registry.validate(fields)
+
+    def _new_widget(self, widget_class: type) -> QWidget:
+        """Берет виджет из пула или создает новый"""
+        if self.widget_pool is not None:
+            widget = self.widget_pool.acquire(widget_class)
+            if widget is not None:
+                return widget
+        return widget_class()
+
+    def style_sheet(self) -> str:
+        return "\n".join(self._style_rules)
+
+    def _style_variant(self, declarations: str) -> str:
+        """Возвращает имя варианта стиля, добавляя его в общую таблицу при первом использовании"""
+        name = self._style_variants.get(declarations)
+        if name is None:
+            name = f"s{len(self._style_variants)}"
+            self._style_variants[declarations] = name
+            # Как и собственная таблица виджета без селектора, правило действует и на дочерние
+            # виджеты (полосы прокрутки QTextEdit, список QComboBox)
+            selector = f'*[{self.STYLE_PROPERTY}="{name}"]'
+            self._style_rules.append(f"{selector}, {selector} * {{ {declarations} }}")
+            self.style_sheet_version += 1
+        return name
+
+    def prepare_styles(self, fields) -> None:
+        """Добавляет варианты стилей всех полей шаблона до создания виджетов
+
+        Таблица стилей тогда устанавливается родителю один раз, а не при
+        появлении каждого нового варианта (что заново полирует все поля).
+        """
+        declarations_by_type = {
+            "label": self._text_declarations,
+            "checkbox": self._text_declarations,
+            "line_edit": self._input_declarations,
+            "text_edit": self._input_declarations,
+            "combo_box": self._input_declarations,
+            "custom": self._custom_declarations,
+        }
+        for field_data in fields:
+            get_declarations = declarations_by_type.get(field_data.widget_type)
+            if get_declarations is None:
+                continue
+            declarations = get_declarations(field_data)
+            if declarations:
+                self._style_variant(declarations)
+            if field_data.widget_type == "custom":
+                # На месте кастомного виджета может оказаться заглушка
+                self._style_variant(self.ERROR_STYLE)
+
+    def _set_style(self, widget: QWidget, declarations: str) -> None:
+        variant = self._style_variant(declarations) if declarations else None
+        if widget.property(self.STYLE_PROPERTY) == variant:
+            return
+        widget.setProperty(self.STYLE_PROPERTY, variant)
+        if widget.testAttribute(Qt.WA_WState_Polished):
+            # Виджет из пула уже отполирован со старым вариантом стиля
+            style = widget.style()
+            style.unpolish(widget)
+            style.polish(widget)
+
+    def _get_font(self, size: int, bold: bool) -> QFont:
+        key = (size, bool(bold))
+        font = self._fonts.get(key)
+        if font is None:
+            font = QFont()
+            font.setPointSize(size)
+            font.setBold(bold)
+            self._fonts[key] = font
+        return font
+
     def create_widget(self, field_data: 'FieldData') -> QWidget:
-        if field_data.widget_type == "label":
-            return self._create_label(field_data)
-        elif field_data.widget_type == "line_edit":
-            return self._create_line_edit(field_data)
-        elif field_data.widget_type == "text_edit":
-            return self._create_text_edit(field_data)
-        elif field_data.widget_type == "checkbox":
-            return self._create_checkbox(field_data)
-        elif field_data.widget_type == "combo_box":
-            return self._create_combo_box(field_data)
-        elif field_data.widget_type == "custom":
-            return self._create_custom_widget(field_data)
-        else:
-            # По умолчанию создаем label
+        creator = self.registry.creator(field_data.widget_type)
+        if creator is None:
             raise Exception(f"Ошибка WidgetFactory: Неизвестный тип поля \"{field_data.widget_type}\".")
+        return creator(field_data)
 
     def _create_label(self, field_data: 'FieldData') -> QLabel:
-        label = QLabel(field_data.default_text)
+        label = self._new_widget(QLabel)
+        label.setText(field_data.default_text)
         self._apply_base_styles(label, field_data)
         self._apply_text_styles(label, field_data)
         return label
 
     def _create_line_edit(self, field_data: 'FieldData') -> QLineEdit:
-        line_edit = QLineEdit()
+        line_edit = self._new_widget(QLineEdit)
         line_edit.setText(field_data.default_text)
         self._apply_base_styles(line_edit, field_data)
         self._apply_input_styles(line_edit, field_data)
         return line_edit
 
     def _create_text_edit(self, field_data: 'FieldData') -> QTextEdit:
-        text_edit = QTextEdit()
+        text_edit = self._new_widget(QTextEdit)
         text_edit.setPlainText(field_data.default_text)
         self._apply_base_styles(text_edit, field_data)
         self._apply_input_styles(text_edit, field_data)
         return text_edit
 
     def _create_checkbox(self, field_data: 'FieldData') -> QCheckBox:
-        checkbox = QCheckBox(field_data.default_text)
+        checkbox = self._new_widget(QCheckBox)
+        checkbox.setText(field_data.default_text)
 
         # Для чекбокса применяем базовые стили, но не стили полей ввода
         self._apply_base_styles(checkbox, field_data)
 
         # Специальные стили для чекбокса
-        if field_data.text_color:
-            current_style = checkbox.styleSheet()
-            checkbox.setStyleSheet(f"{current_style} color: {field_data.text_color};")
+        self._set_style(checkbox, self._text_declarations(field_data))
 
         return checkbox
 
     def _create_combo_box(self, field_data: 'FieldData') -> QComboBox:
-        combo = QComboBox()
+        combo = self._new_widget(QComboBox)
 
         # Добавляем опции если они есть
         if field_data.options:
@@ -82,18 +188,18 @@ class DefaultWidgetFactory(WidgetFactoryInterface):
 
     def _create_custom_widget(self, field_data: 'FieldData') -> QWidget:
         """Создает кастомный виджет на основе настроек"""
-        try:
-            # Импортируем класс кастомного виджета по имени
-            import importlib
-            module_name, class_name = field_data.custom_widget_class.rsplit('.', 1)
-            module = importlib.import_module(module_name)
-            widget_class = getattr(module, class_name)
+        # Класс загружается один раз, ошибка загрузки тоже запоминается
+        widget_class = self.registry.resolve_class(field_data.custom_widget_class)
+        if widget_class is None:
+            return self._create_error_stub(field_data)
 
-            # Создаем экземпляр виджета
-            widget = widget_class(self.parent_widget)
+        try:
+            # Создаем экземпляр виджета, если в пуле нет сброшенного (родителя задает FieldManager)
+            widget = self._new_widget(widget_class)
 
             # Применяем базовые стили
             self._apply_base_styles(widget, field_data)
+            self._set_style(widget, self._custom_declarations(field_data))
 
             # Устанавливаем кастомные свойства
             for prop_name, prop_value in field_data.custom_properties.items():
@@ -104,20 +210,36 @@ class DefaultWidgetFactory(WidgetFactoryInterface):
 
         except Exception as e:
             print(f"Ошибка при создании кастомного виджета {field_data.custom_widget_class}: {e}")
-            # Возвращаем заглушку в случае ошибки
-            label = QLabel(f"Ошибка: {field_data.field_id}")
-            label.setStyleSheet("background-color: red; color: white;")
-            return label
+            return self._create_error_stub(field_data)
+
+    def _create_error_stub(self, field_data: 'FieldData') -> QLabel:
+        # Заглушка на месте виджета, который не удалось создать
+        label = self._new_widget(QLabel)
+        label.setText(f"Ошибка: {field_data.field_id}")
+        self._set_style(label, self.ERROR_STYLE)
+        return label
 
     def _apply_base_styles(self, widget: QWidget, field_data: 'FieldData'):
-        # Базовые стили для всех виджетов
-        font = QFont()
-        font.setPointSize(field_data.font_size)
-        font.setBold(field_data.bold)
-        widget.setFont(font)
+        # Базовые стили для всех виджетов; фон задается вариантом стиля каждого типа
+        widget.setFont(self._get_font(field_data.font_size, field_data.bold))
+
+    def _text_declarations(self, field_data: 'FieldData') -> str:
+        # Фон и цвет текста для надписей и чекбоксов
+        declarations = []
+        if field_data.background_color:
+            declarations.append(f"background-color: {field_data.background_color};")
+        if field_data.text_color:
+            declarations.append(f"color: {field_data.text_color};")
+        return " ".join(declarations)
 
+    def _input_declarations(self, field_data: 'FieldData') -> str:
+        background = field_data.background_color or self.INPUT_BACKGROUND
+        return self.INPUT_STYLE.format(background=background)
+
+    def _custom_declarations(self, field_data: 'FieldData') -> str:
         if field_data.background_color:
-            widget.setStyleSheet(f"background-color: {field_data.background_color};")
+            return f"background-color: {field_data.background_color};"
+        return ""
 
     def _apply_text_styles(self, label: QLabel, field_data: 'FieldData'):
         # Стили специфичные для текстовых элементов
@@ -132,21 +254,8 @@ class DefaultWidgetFactory(WidgetFactoryInterface):
         if field_data.alignment in alignment_map:
             label.setAlignment(alignment_map[field_data.alignment])
 
-        if field_data.text_color:
-            current_style = label.styleSheet()
-            label.setStyleSheet(f"{current_style} color: {field_data.text_color};")
+        self._set_style(label, self._text_declarations(field_data))
 
     def _apply_input_styles(self, input_widget: QWidget, field_data: 'FieldData'):
-        # Стили для полей ввода
-        style_sheet = """
-            background-color: rgba(255, 255, 255, 0.3);
-            border: 1px solid #cccccc;
-            border-radius: 3px;
-            padding: 2px 5px;
-            color: black;
-        """
-
-        if field_data.background_color:
-            style_sheet = style_sheet.replace("rgba(255, 255, 255, 0.3)", field_data.background_color)
-
-        input_widget.setStyleSheet(style_sheet)
\ No newline at end of file
+        # Стили для полей ввода заменяют базовые
+        self._set_style(input_widget, self._input_declarations(field_data))
\ No newline at end of file
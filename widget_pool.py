@@ -0,0 +1,116 @@
+# widget_pool.py
+from PySide6.QtWidgets import QWidget, QLabel, QLineEdit, QTextEdit, QCheckBox, QComboBox
+from PySide6.QtCore import Qt
+
+
+def _reset_label(label: QLabel) -> None:
+    label.clear()
+    label.setAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+
+
+def _reset_line_edit(line_edit: QLineEdit) -> None:
+    line_edit.clear()
+
+
+def _reset_text_edit(text_edit: QTextEdit) -> None:
+    text_edit.clear()
+
+
+def _reset_checkbox(checkbox: QCheckBox) -> None:
+    checkbox.setChecked(False)
+    checkbox.setText("")
+
+
+def _reset_combo_box(combo: QComboBox) -> None:
+    combo.clear()
+
+
+class WidgetPool:
+    """Пул освобожденных виджетов полей для повторного использования следующей формой
+
+    Виджеты хранятся отдельно для каждого класса. В пул попадают только виджеты
+    классов, для которых зарегистрирована функция сброса состояния; количество
+    виджетов одного класса ограничено max_per_class.
+    """
+
+    def __init__(self, max_per_class: int = 500) -> None:
+        self.max_per_class: int = max_per_class
+        self._free: dict = {}
+        self._reset_hooks: dict = {
+            QLabel: _reset_label,
+            QLineEdit: _reset_line_edit,
+            QTextEdit: _reset_text_edit,
+            QCheckBox: _reset_checkbox,
+            QComboBox: _reset_combo_box,
+        }
+
+        # Статистика: выданные из пула, созданные заново, возвращенные и удаленные виджеты
+        self.reused: int = 0
+        self.created: int = 0
+        self.released: int = 0
+        self.discarded: int = 0
+
+    def register_reset_hook(self, widget_class: type, reset_hook) -> None:
+        """Разрешает хранить в пуле виджеты класса widget_class; reset_hook(widget) сбрасывает их состояние"""
+        self._reset_hooks[widget_class] = reset_hook
+
+    def acquire(self, widget_class: type):
+        """Возвращает виджет класса widget_class из пула или None"""
+        free = self._free.get(widget_class)
+        if free:
+            self.reused += 1
+            return free.pop()
+        self.created += 1
+        return None
+
+    def release(self, widget: QWidget) -> bool:
+        """Сбрасывает виджет и кладет его в пул; False - виджет нужно удалить"""
+        widget_class = type(widget)
+        reset_hook = self._reset_hooks.get(widget_class)
+        free = self._free.setdefault(widget_class, [])
+        if reset_hook is None or len(free) >= self.max_per_class:
+            self.discarded += 1
+            return False
+
+        widget.hide()
+        widget.clearFocus()
+        widget.setEnabled(True)
+        widget.setMinimumSize(0, 0)
+        # Шрифт и вариант стиля фабрика задает заново при повторном использовании
+        try:
+            reset_hook(widget)
+        except Exception as e:
+            print(f"Ошибка при сбросе виджета {widget_class.__name__}: {e}")
+            self.discarded += 1
+            return False
+
+        free.append(widget)
+        self.released += 1
+        return True
+
+    def set_max_per_class(self, max_per_class: int) -> None:
+        self.max_per_class = max_per_class
+        for free in self._free.values():
+            while len(free) > max_per_class:
+                free.pop().deleteLater()
+
+    def clear(self) -> None:
+        """Удаляет все виджеты пула"""
+        for free in self._free.values():
+            for widget in free:
+                widget.deleteLater()
+        self._free.clear()
+
+    def size(self) -> int:
+        return sum(len(free) for free in self._free.values())
+
+    def statistics(self) -> dict:
+        requested = self.reused + self.created
+        return {
+            "reused": self.reused,
+            "created": self.created,
+            "released": self.released,
+            "discarded": self.discarded,
+            "pooled": self.size(),
+            "reuse_rate": self.reused / requested if requested else 0.0,
+        }
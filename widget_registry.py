@@ -0,0 +1,65 @@
+# widget_registry.py
+import importlib
+from PySide6.QtWidgets import QWidget
+
+
+class WidgetRegistry:
+    """Соответствие типов полей функциям создания виджетов и кэш классов кастомных виджетов
+
+    Классы кастомных виджетов загружаются по пути "модуль.Класс" при первом
+    обращении, поэтому модули плагинов, которые не используются шаблонами, не
+    импортируются. Результат загрузки, в том числе ошибка, запоминается.
+    """
+
+    def __init__(self) -> None:
+        self._creators: dict = {}
+        # Путь класса -> класс виджета или None, если загрузить его не удалось
+        self._classes: dict = {}
+        self.errors: dict = {}
+
+    def register(self, widget_type: str, creator) -> None:
+        """Регистрирует функцию creator(field_data) -> QWidget для типа поля"""
+        self._creators[widget_type] = creator
+
+    def unregister(self, widget_type: str) -> None:
+        self._creators.pop(widget_type, None)
+
+    def creator(self, widget_type: str):
+        return self._creators.get(widget_type)
+
+    def __contains__(self, widget_type: str) -> bool:
+        return widget_type in self._creators
+
+    def resolve_class(self, class_path: str):
+        """Возвращает класс виджета по пути "модуль.Класс" или None при ошибке"""
+        try:
+            return self._classes[class_path]
+        except KeyError:
+            pass
+
+        widget_class = None
+        try:
+            if not class_path or "." not in class_path:
+                raise ValueError("ожидается путь вида модуль.Класс")
+            module_name, class_name = class_path.rsplit(".", 1)
+            widget_class = getattr(importlib.import_module(module_name), class_name)
+            if not (isinstance(widget_class, type) and issubclass(widget_class, QWidget)):
+                raise TypeError(f"{class_name} не является классом виджета")
+        except Exception as e:
+            widget_class = None
+            self.errors[class_path] = str(e)
+            print(f"Ошибка при загрузке класса кастомного виджета {class_path}: {e}")
+
+        self._classes[class_path] = widget_class
+        return widget_class
+
+    def validate(self, fields) -> dict:
+        """Проверяет типы полей и классы кастомных виджетов, возвращает {field_id: ошибка}"""
+        problems = {}
+        for field_data in fields:
+            if field_data.widget_type not in self._creators:
+                problems[field_data.field_id] = f"неизвестный тип поля \"{field_data.widget_type}\""
+            elif field_data.widget_type == "custom":
+                if self.resolve_class(field_data.custom_widget_class) is None:
+                    problems[field_data.field_id] = self.errors[field_data.custom_widget_class]
+        return problems